@@ -0,0 +1,212 @@
+#!/usr/bin/env python3
+"""
+Build the typo-tolerant autocomplete artifact for drink and ingredient names.
+
+The artifact (data/autocomplete.json) has three parts:
+
+    terms     [display name, kind, [drink ids]] for every drink name and
+              canonical ingredient name
+    keys      [key, term index] sorted by key, one entry per word start of each
+              term ("classic margarita" -> "classic margarita", "margarita"),
+              so a prefix lookup is a binary search
+    trigrams  trigram -> sorted key indices, used to find candidate keys for
+              misspelled queries ("margarta", "cointreu") that are then
+              verified with a bounded prefix edit distance
+
+search_functionality.js performs the same lookup in the browser; the
+Autocomplete class here is the Python side used by tooling and benchmarks.
+
+Usage:
+    python3 autocomplete_index.py [--catalog data/drinks.json] [--output data/autocomplete.json]
+"""
+
+import argparse
+import json
+import re
+from bisect import bisect_left
+
+from ingredients import drink_ingredients
+
+ARTIFACT_VERSION = 1
+
+_NON_WORD = re.compile(r"[^a-z0-9]+")
+
+
+def normalize(text):
+    """Lowercase and collapse everything but letters and digits to single spaces"""
+    return _NON_WORD.sub(" ", text.lower()).strip()
+
+
+def trigrams(key):
+    """Trigrams of a key, padded at the start so the first letters count"""
+    padded = "  " + key
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+def max_distance(query):
+    """Edit distance tolerated for a query of this length"""
+    if len(query) <= 3:
+        return 0
+    if len(query) <= 6:
+        return 1
+    return 2
+
+
+def prefix_distance(query, key, limit):
+    """Smallest edit distance between ``query`` and any prefix of ``key``
+
+    Returns ``limit + 1`` as soon as the distance is known to exceed ``limit``.
+    """
+    previous = list(range(len(key) + 1))
+    for i, qc in enumerate(query, 1):
+        current = [i]
+        row_min = i
+        for j, kc in enumerate(key, 1):
+            cost = previous[j - 1] + (qc != kc)
+            value = min(cost, previous[j] + 1, current[j - 1] + 1)
+            current.append(value)
+            if value < row_min:
+                row_min = value
+        if row_min > limit:
+            return limit + 1
+        previous = current
+    return min(previous)
+
+
+def build_autocomplete(drinks):
+    """Return the autocomplete artifact for a catalog"""
+    term_index = {}
+    terms = []
+
+    def add_term(display, kind, drink_id):
+        norm = normalize(display)
+        if not norm:
+            return
+        index = term_index.get((kind, norm))
+        if index is None:
+            index = term_index[(kind, norm)] = len(terms)
+            terms.append([display, kind, []])
+        if drink_id is not None:
+            terms[index][2].append(drink_id)
+
+    for drink in drinks:
+        drink_id = drink.get("id")
+        if drink.get("name"):
+            add_term(drink["name"], "drink", drink_id)
+        for name in drink_ingredients(drink):
+            add_term(name, "ingredient", drink_id)
+
+    keys = []
+    for index, (display, kind, ids) in enumerate(terms):
+        words = normalize(display).split(" ")
+        for start in range(len(words)):
+            keys.append([" ".join(words[start:]), index])
+    keys.sort()
+
+    grams = {}
+    for key_index, (key, _) in enumerate(keys):
+        for gram in trigrams(key.split(" ")[0]):
+            grams.setdefault(gram, []).append(key_index)
+
+    return {
+        "version": ARTIFACT_VERSION,
+        "terms": terms,
+        "keys": keys,
+        "trigrams": grams,
+    }
+
+
+class Autocomplete:
+    """Prefix and fuzzy lookup over an autocomplete artifact"""
+
+    def __init__(self, artifact):
+        self.terms = artifact["terms"]
+        self.keys = [key for key, _ in artifact["keys"]]
+        self.key_terms = [term for _, term in artifact["keys"]]
+        self.trigrams = artifact["trigrams"]
+
+    @classmethod
+    def load(cls, path):
+        with open(path, "r", encoding="utf-8") as f:
+            return cls(json.load(f))
+
+    def _prefix_matches(self, query, limit):
+        matches = []
+        position = bisect_left(self.keys, query)
+        while position < len(self.keys) and self.keys[position].startswith(query) and len(matches) < limit:
+            matches.append(position)
+            position += 1
+        return matches
+
+    def _fuzzy_matches(self, query, distance):
+        # Only the first word of the query is matched against trigrams; every
+        # edit can break at most three of them
+        first_word = query.split(" ")[0]
+        query_grams = trigrams(first_word)
+        needed = max(1, len(query_grams) - 3 * distance)
+        hits = {}
+        for gram in query_grams:
+            for key_index in self.trigrams.get(gram, ()):
+                hits[key_index] = hits.get(key_index, 0) + 1
+        matches = []
+        for key_index, count in hits.items():
+            if count < needed:
+                continue
+            found = prefix_distance(query, self.keys[key_index], distance)
+            if found <= distance:
+                matches.append((found, key_index))
+        return matches
+
+    def suggest(self, query, limit=10):
+        """Return up to ``limit`` ranked suggestions as dicts with name, kind, ids and distance"""
+        query = normalize(query)
+        if not query:
+            return []
+
+        candidates = [(0, key_index) for key_index in self._prefix_matches(query, limit * 20)]
+        distance = max_distance(query)
+        if distance and len(candidates) < limit:
+            candidates.extend(self._fuzzy_matches(query, distance))
+
+        best = {}
+        for found, key_index in candidates:
+            term = self.key_terms[key_index]
+            display, kind, ids = self.terms[term]
+            # A name equal to the query ("gin") beats longer names starting
+            # with it ("Gin Limey"), and matching the start of the name beats
+            # matching a later word
+            key = self.keys[key_index]
+            exact = found == 0 and key == query
+            whole_name = key == normalize(display)
+            rank = (found, not exact, not whole_name, kind != "drink", -len(ids), len(display))
+            if term not in best or rank < best[term][0]:
+                best[term] = (rank, found)
+
+        ordered = sorted(best.items(), key=lambda item: item[1][0])[:limit]
+        return [
+            {"name": self.terms[term][0], "kind": self.terms[term][1],
+             "ids": self.terms[term][2], "distance": found}
+            for term, (rank, found) in ordered
+        ]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Build the drink/ingredient autocomplete index")
+    parser.add_argument("--catalog", default="data/drinks.json")
+    parser.add_argument("--output", default="data/autocomplete.json")
+    args = parser.parse_args(argv)
+
+    with open(args.catalog, "r", encoding="utf-8") as f:
+        drinks = json.load(f)
+
+    artifact = build_autocomplete(drinks)
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(artifact, f, separators=(",", ":"), ensure_ascii=False)
+
+    print(f"Indexed {len(artifact['terms'])} names as {len(artifact['keys'])} keys "
+          f"and {len(artifact['trigrams'])} trigrams")
+    print(f"Saved to: {args.output}")
+
+
+if __name__ == "__main__":
+    main()
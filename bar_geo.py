@@ -0,0 +1,243 @@
+#!/usr/bin/env python3
+"""
+Coordinates and a geohash spatial index for data/bars.json.
+
+Bars get ``lat``/``lon`` either by manual entry in bars.json or from the
+offline lookup table data/bar_locations.json (address -> [lat, lon]); no
+network geocoding is done. The index stores every bar's geohash in one sorted
+list. Because geohashes are hierarchical, the cells covering a query circle
+are prefix ranges of that list, so "bars within R km" is a handful of binary
+searches whatever the number of venues. Candidates are then filtered by
+haversine distance and ranked by how well the bar's mood_profile matches the
+requested moods.
+
+Usage:
+    python3 bar_geo.py [--bars data/bars.json] [--locations data/bar_locations.json]
+                       [--output data/bars_geo_index.json] [--write-bars]
+    python3 bar_geo.py --near 27.96 -82.44 --radius 2 --mood relaxed=9 --mood cozy=8
+"""
+
+import argparse
+import json
+import math
+from bisect import bisect_left, bisect_right
+
+ARTIFACT_VERSION = 1
+INDEX_PRECISION = 9
+EARTH_RADIUS_KM = 6371.0088
+
+_BASE32 = "0123456789bcdefghjkmnpqrstuvwxyz"
+
+
+def geohash_encode(lat, lon, precision=INDEX_PRECISION):
+    """Encode a coordinate as a geohash string"""
+    lat_range = [-90.0, 90.0]
+    lon_range = [-180.0, 180.0]
+    chars = []
+    bits = 0
+    value = 0
+    even = True
+    while len(chars) < precision:
+        if even:
+            mid = (lon_range[0] + lon_range[1]) / 2
+            if lon >= mid:
+                value = (value << 1) | 1
+                lon_range[0] = mid
+            else:
+                value <<= 1
+                lon_range[1] = mid
+        else:
+            mid = (lat_range[0] + lat_range[1]) / 2
+            if lat >= mid:
+                value = (value << 1) | 1
+                lat_range[0] = mid
+            else:
+                value <<= 1
+                lat_range[1] = mid
+        even = not even
+        bits += 1
+        if bits == 5:
+            chars.append(_BASE32[value])
+            bits = 0
+            value = 0
+    return "".join(chars)
+
+
+def cell_size_degrees(precision):
+    """(height, width) in degrees of a geohash cell at ``precision``"""
+    total_bits = 5 * precision
+    lon_bits = (total_bits + 1) // 2
+    lat_bits = total_bits // 2
+    return 180.0 / (1 << lat_bits), 360.0 / (1 << lon_bits)
+
+
+def haversine_km(lat1, lon1, lat2, lon2):
+    phi1, phi2 = math.radians(lat1), math.radians(lat2)
+    dphi = phi2 - phi1
+    dlambda = math.radians(lon2 - lon1)
+    a = math.sin(dphi / 2) ** 2 + math.cos(phi1) * math.cos(phi2) * math.sin(dlambda / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * math.asin(min(1.0, math.sqrt(a)))
+
+
+def mood_match(moods, profile):
+    """0-10 similarity between requested moods and a bar's mood_profile"""
+    if not moods:
+        return None
+    diffs = [abs(value - profile.get(mood, 5)) for mood, value in moods.items()]
+    return 10 - sum(diffs) / len(diffs)
+
+
+def _address_key(address):
+    return " ".join(address.lower().replace(",", " ").split())
+
+
+def attach_coordinates(bars, locations):
+    """Fill missing lat/lon from the lookup table; return the bars still without coordinates"""
+    lookup = {_address_key(address): coords for address, coords in locations.items()}
+    missing = []
+    for bar in bars:
+        if bar.get("lat") is not None and bar.get("lon") is not None:
+            continue
+        coords = lookup.get(_address_key(bar.get("address", "")))
+        if coords is None:
+            missing.append(bar)
+            continue
+        bar["lat"], bar["lon"] = coords
+    return missing
+
+
+def build_geo_index(bars):
+    """Return the spatial index artifact for bars that have coordinates"""
+    entries = sorted(
+        (geohash_encode(bar["lat"], bar["lon"]), bar["id"], bar["lat"], bar["lon"])
+        for bar in bars
+        if bar.get("lat") is not None and bar.get("lon") is not None
+    )
+    return {
+        "version": ARTIFACT_VERSION,
+        "precision": INDEX_PRECISION,
+        # [geohash, bar id, lat, lon], sorted by geohash
+        "bars": [list(entry) for entry in entries],
+    }
+
+
+class BarGeoIndex:
+    """Radius queries over a geohash-sorted bar list"""
+
+    def __init__(self, artifact, bars=None):
+        self.precision = artifact["precision"]
+        self.hashes = [entry[0] for entry in artifact["bars"]]
+        self.entries = artifact["bars"]
+        self.bars_by_id = {bar["id"]: bar for bar in bars} if bars else {}
+
+    @staticmethod
+    def _bounding_box(lat, lon, radius_km):
+        """(south, north, west, east) in degrees of the circle; west/east are not wrapped
+
+        The longitude half-width is that of the circle's widest point,
+        asin(sin(r / R) / cos(lat)), which lies poleward of the center. A
+        circle that reaches a pole covers every longitude.
+        """
+        angle = radius_km / EARTH_RADIUS_KM
+        dlat = math.degrees(angle)
+        south, north = lat - dlat, lat + dlat
+        if south <= -90.0 or north >= 90.0:
+            return max(-90.0, south), min(90.0, north), -180.0, 180.0
+        ratio = math.sin(angle) / math.cos(math.radians(lat))
+        if ratio >= 1.0:
+            return south, north, -180.0, 180.0
+        dlon = math.degrees(math.asin(ratio))
+        return south, north, lon - dlon, lon + dlon
+
+    def _query_precision(self, box):
+        # Coarsest cells still at least half as large as the box keep the
+        # probe count to a few cells
+        south, north, west, east = box
+        for precision in range(self.precision, 0, -1):
+            height, width = cell_size_degrees(precision)
+            if height >= (north - south) / 2 and width >= (east - west) / 2:
+                return precision
+        return 1
+
+    def _covering_cells(self, box, precision):
+        south, north, west, east = box
+        height, width = cell_size_degrees(precision)
+        lats = [south + i * height for i in range(int((north - south) / height) + 1)] + [north]
+        lons = [west + i * width for i in range(int((east - west) / width) + 1)] + [east]
+        cells = set()
+        for cell_lat in lats:
+            for cell_lon in lons:
+                wrapped = (cell_lon + 180.0) % 360.0 - 180.0
+                cells.add(geohash_encode(min(cell_lat, 89.999999), wrapped, precision))
+        return cells
+
+    def within(self, lat, lon, radius_km):
+        """Yield (bar id, distance km) for bars within ``radius_km``"""
+        box = self._bounding_box(lat, lon, radius_km)
+        for cell in self._covering_cells(box, self._query_precision(box)):
+            start = bisect_left(self.hashes, cell)
+            end = bisect_right(self.hashes, cell + "~")
+            for geohash, bar_id, bar_lat, bar_lon in self.entries[start:end]:
+                distance = haversine_km(lat, lon, bar_lat, bar_lon)
+                if distance <= radius_km:
+                    yield bar_id, distance
+
+    def nearby(self, lat, lon, radius_km, moods=None, limit=10, min_match=0):
+        """Bars within ``radius_km``, best mood match first (nearest first without moods)"""
+        results = []
+        for bar_id, distance in self.within(lat, lon, radius_km):
+            bar = self.bars_by_id.get(bar_id, {})
+            match = mood_match(moods, bar.get("mood_profile", {}))
+            if match is not None and match < min_match:
+                continue
+            results.append({"id": bar_id, "name": bar.get("name"), "distance_km": round(distance, 3),
+                            "mood_match": round(match, 2) if match is not None else None})
+        if moods:
+            results.sort(key=lambda r: (-r["mood_match"], r["distance_km"]))
+        else:
+            results.sort(key=lambda r: r["distance_km"])
+        return results[:limit]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Geocode bars offline and build the nearest-bar index")
+    parser.add_argument("--bars", default="data/bars.json")
+    parser.add_argument("--locations", default="data/bar_locations.json")
+    parser.add_argument("--output", default="data/bars_geo_index.json")
+    parser.add_argument("--write-bars", action="store_true", help="store the attached lat/lon back in bars.json")
+    parser.add_argument("--near", nargs=2, type=float, metavar=("LAT", "LON"), help="query instead of building")
+    parser.add_argument("--radius", type=float, default=5.0, help="query radius in km")
+    parser.add_argument("--mood", action="append", default=[], metavar="MOOD=VALUE")
+    args = parser.parse_args(argv)
+
+    with open(args.bars, "r", encoding="utf-8") as f:
+        bars = json.load(f)
+    with open(args.locations, "r", encoding="utf-8") as f:
+        locations = json.load(f)
+
+    missing = attach_coordinates(bars, locations)
+    for bar in missing:
+        print(f"No coordinates for {bar.get('id')} ({bar.get('address')}); add it to {args.locations}")
+
+    artifact = build_geo_index(bars)
+
+    if args.near:
+        moods = {mood: float(value) for mood, value in (item.split("=", 1) for item in args.mood)}
+        index = BarGeoIndex(artifact, bars)
+        for result in index.nearby(args.near[0], args.near[1], args.radius, moods):
+            print(result)
+        return
+
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(artifact, f, separators=(",", ":"))
+    print(f"Indexed {len(artifact['bars'])} of {len(bars)} bars")
+    print(f"Saved to: {args.output}")
+
+    if args.write_bars:
+        with open(args.bars, "w", encoding="utf-8") as f:
+            json.dump(bars, f, indent=2, ensure_ascii=False)
+        print(f"Saved coordinates to: {args.bars}")
+
+
+if __name__ == "__main__":
+    main()
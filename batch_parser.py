@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+"""
+Record parser for the tab-separated batch exports in data/batches/.
+
+Records come from batch_reader.MappedBatch, which memory-maps the file and
+finds record boundaries. Quoted records are split with the csv module's C
+reader and a TSV dialect, so a quoted field may contain tabs and span several
+lines (the spreadsheet quotes long instructions such as "Breath of God #2").
+Inside a field, a backslash at the end of a line marks a line break the
+spreadsheet kept in the cell: the backslash is dropped and the line break
+stays, so numbered steps remain on their own lines.
+
+Every parser indexes rows in the canonical column order of COLUMNS. A source
+whose export uses a different order declares its own BatchLayout in
+SOURCE_LAYOUTS, and read_batch() reorders its rows to the canonical one.
+
+    for record_num, parts in read_batch("data/batches/latest_batch.tsv", "latest_batch", metrics):
+        ...
+"""
+
+import csv
+import io
+
+from batch_reader import MappedBatch
+
+# Canonical column order of a batch row
+COLUMNS = (
+    "id", "name", "category", "alcoholic", "glass", "ingredients", "instructions", "shopping_list",
+    "dark", "thirsty", "calm", "celebrate", "fancy", "total",
+    "dark_pct", "thirsty_pct", "calm_pct", "celebrate_pct", "fancy_pct", "percent_6", "percent_7",
+    "flag_1", "flag_2", "flag_3", "flag_4", "flag_5", "flag_6",
+)
+
+
+class BatchDialect(csv.Dialect):
+    """Spreadsheet TSV export: tab-delimited, fields quoted only when needed"""
+    delimiter = "\t"
+    quotechar = '"'
+    doublequote = True
+    skipinitialspace = False
+    lineterminator = "\n"
+    quoting = csv.QUOTE_MINIMAL
+    strict = False
+
+
+csv.register_dialect("thinkdrink-batch", BatchDialect)
+
+
+class BatchLayout:
+    """Column order of one source's export and the fields a usable row needs"""
+
+    def __init__(self, columns=COLUMNS, min_fields=13):
+        self.columns = tuple(columns)
+        self.min_fields = min_fields
+        if self.columns == COLUMNS:
+            self._order = None
+        else:
+            # For each canonical column, its position in the source row (None if absent)
+            self._order = [self.columns.index(name) if name in self.columns else None for name in COLUMNS]
+
+    def to_canonical(self, fields):
+        """Reorder a source row to COLUMNS; absent columns become empty strings"""
+        if self._order is None:
+            return fields
+        return [fields[i] if i is not None and i < len(fields) else "" for i in self._order]
+
+
+SOURCE_LAYOUTS = {
+    "full_dataset": BatchLayout(min_fields=13),
+    "new_cocktails": BatchLayout(min_fields=13),
+    "latest_batch": BatchLayout(min_fields=15),
+    "new_batch": BatchLayout(min_fields=13),
+}
+
+
+def join_continuations(field):
+    """Turn backslash-newline continuations inside a field into plain line breaks"""
+    if "\\" not in field:
+        return field
+    return field.replace("\\\r\n", "\n").replace("\\\n", "\n")
+
+
+def split_record(text):
+    """Fields of one record's text, as returned by MappedBatch
+
+    A record without a quote character is split on tabs directly, which gives
+    exactly what the csv reader would; only quoted records go through csv.
+    """
+    if '"' not in text:
+        return text.split("\t")
+    fields = next(csv.reader(io.StringIO(text, newline=""), dialect="thinkdrink-batch"), [""])
+    if "\n" in text:
+        # Only a record that spans several lines can hold continuations
+        fields = [join_continuations(field) for field in fields]
+    return fields
+
+
+def read_batch(path, source=None, metrics=None, stage="parse"):
+    """Yield (record number, fields) for every usable record of a batch file
+
+    ``source`` names an entry of SOURCE_LAYOUTS (or is a BatchLayout); rows
+    are returned in canonical column order. Records with too few fields or a
+    non-integer id are counted as errors against ``stage`` of ``metrics`` (or
+    printed without metrics) and skipped.
+    """
+    layout = source if isinstance(source, BatchLayout) else SOURCE_LAYOUTS.get(source, BatchLayout())
+    with MappedBatch(path) as batch:
+        reorder = layout.to_canonical if layout.columns != COLUMNS else None
+        min_fields = layout.min_fields
+        for record_num, (line_num, text) in enumerate(batch.records(), 1):
+            fields = split_record(text)
+            error = None
+            if len(fields) < min_fields:
+                error = f"Record {record_num} (line {line_num}): Not enough fields ({len(fields)})"
+            else:
+                if reorder is not None:
+                    fields = reorder(fields)
+                try:
+                    int(fields[0])
+                except ValueError:
+                    error = f"Record {record_num} (line {line_num}): Invalid id {fields[0][:20]!r}"
+            if error:
+                if metrics is None:
+                    print(error)
+                else:
+                    metrics.error(stage, error)
+                continue
+            yield record_num, fields
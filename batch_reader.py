@@ -0,0 +1,249 @@
+#!/usr/bin/env python3
+"""
+Memory-mapped record reader for ingest batch files in data/batches/.
+
+The file is mapped read-only. Reading it in order streams records straight
+from the mapping; the first random access scans it once to build an index of
+record start and end offsets, after which any record can be fetched by number
+and parallel workers can split the file into byte ranges that fall on record
+boundaries without copying it.
+
+A record is usually one line, but a quoted field may hold line breaks (see
+batch_parser.py), so the scan tracks quote state the way the csv module does:
+a field is quoted only when it starts with '"', and '""' inside it is an
+escaped quote. Only lines that contain a quote pay for that; every other line
+is found with a plain newline search.
+
+    with MappedBatch("data/batches/latest_batch.tsv") as batch:
+        print(len(batch), batch[0])
+        for start, end in batch.byte_ranges(4):
+            ...  # hand (path, start, end) to a worker that calls iter_records()
+"""
+
+import mmap
+from array import array
+from bisect import bisect_left
+
+# Most bytes decoded at once when streaming quote-free lines
+READ_WINDOW = 1 << 20
+
+_QUOTE = ord('"')
+_TAB = ord("\t")
+
+
+def _open_map(f):
+    # mmap cannot map an empty file
+    f.seek(0, 2)
+    if f.tell() == 0:
+        return b""
+    return mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+
+def _decode(raw):
+    if raw.endswith(b"\r"):
+        raw = raw[:-1]
+    return raw.decode("utf-8")
+
+
+def _in_quotes_after(line, in_quotes):
+    """Whether a quoted field is still open at the end of ``line`` (bytes)"""
+    field_start = not in_quotes
+    i = 0
+    size = len(line)
+    while i < size:
+        c = line[i]
+        if in_quotes:
+            if c == _QUOTE:
+                if i + 1 < size and line[i + 1] == _QUOTE:
+                    i += 1
+                else:
+                    in_quotes = False
+        elif c == _TAB:
+            field_start = True
+            i += 1
+            continue
+        elif c == _QUOTE and field_start:
+            in_quotes = True
+        field_start = False
+        i += 1
+    return in_quotes
+
+
+def _record_end(data, pos):
+    """(end offset, line count) of the record starting at ``pos``; the end excludes its newline"""
+    size = len(data)
+    in_quotes = False
+    lines = 0
+    while True:
+        line_end = data.find(b"\n", pos)
+        if line_end == -1:
+            line_end = size
+        lines += 1
+        if in_quotes or data.find(b'"', pos, line_end) != -1:
+            in_quotes = _in_quotes_after(data[pos:line_end], in_quotes)
+        pos = line_end + 1
+        if not in_quotes or pos >= size:
+            return line_end, lines
+
+
+def _scan_records(data, start, end):
+    """Yield (start, end, last line number) of each non-blank record starting in [start, end)
+
+    ``start`` must be a record boundary. Line numbers count from ``start``.
+    """
+    pos = start
+    line_num = 0
+    while pos < end:
+        record_end, lines = _record_end(data, pos)
+        line_num += lines
+        if data[pos:record_end].strip():
+            yield pos, record_end, line_num
+        pos = record_end + 1
+
+
+def _iter_records(data, start, end):
+    """Yield (last line number, text) of each non-blank record in [start, end)
+
+    ``start`` and ``end`` must be record boundaries (or the file size). Runs
+    of lines without a quote are decoded and split in windows of up to
+    READ_WINDOW bytes, so only one window is ever copied out of the mapping; a
+    line with a quote (or longer than a window) is a record delimited with
+    _record_end().
+    """
+    pos = start
+    line_num = 0
+    while pos < end:
+        window_end = min(end, pos + READ_WINDOW)
+        quote = data.find(b'"', pos, window_end)
+        if quote != -1:
+            plain_end = data.rfind(b"\n", pos, quote) + 1
+        elif window_end == end:
+            plain_end = end
+        else:
+            plain_end = data.rfind(b"\n", pos, window_end) + 1
+        if plain_end > pos:
+            lines = data[pos:plain_end].decode("utf-8").split("\n")
+            if lines[-1] == "":
+                lines.pop()
+            for line in lines:
+                line_num += 1
+                if line.endswith("\r"):
+                    line = line[:-1]
+                if line.strip():
+                    yield line_num, line
+            pos = plain_end
+        else:
+            record_end, lines = _record_end(data, pos)
+            line_num += lines
+            raw = data[pos:record_end]
+            if raw.strip():
+                yield line_num, _decode(raw)
+            pos = record_end + 1
+
+
+class MappedBatch:
+    """Read-only, memory-mapped view of a batch file with a record-offset index
+
+    Blank lines are skipped, so ``len(batch)`` is the number of data records.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._file = open(path, "rb")
+        self._map = _open_map(self._file)
+        self._starts = None
+
+    def _index(self):
+        # Built on first random access; sequential reads stream without it
+        if self._starts is None:
+            self._starts = array("Q")
+            self._ends = array("Q")
+            self._lines = array("Q")
+            for start, end, line_num in _scan_records(self._map, 0, len(self._map)):
+                self._starts.append(start)
+                self._ends.append(end)
+                self._lines.append(line_num)
+
+    @property
+    def size(self):
+        return len(self._map)
+
+    def __len__(self):
+        self._index()
+        return len(self._starts)
+
+    def __getitem__(self, index):
+        self._index()
+        if index < 0:
+            index += len(self._starts)
+        if not 0 <= index < len(self._starts):
+            raise IndexError("batch record index out of range")
+        return _decode(self._map[self._starts[index]:self._ends[index]])
+
+    def __iter__(self):
+        for _, text in self.records():
+            yield text
+
+    def records(self):
+        """Yield (last line number, text) of every record, in file order"""
+        return _iter_records(self._map, 0, len(self._map))
+
+    def offset(self, index):
+        """Byte offset at which record ``index`` starts"""
+        self._index()
+        return self._starts[index]
+
+    def line_number(self, index):
+        """Line number (from 1) of the last line of record ``index``"""
+        self._index()
+        return self._lines[index]
+
+    def byte_ranges(self, parts):
+        """Split the file into up to ``parts`` (start, end) byte ranges on record boundaries"""
+        self._index()
+        count = len(self._starts)
+        if count == 0:
+            return []
+        parts = max(1, min(parts, count))
+        bounds = [self._starts[count * i // parts] for i in range(parts)]
+        bounds.append(self.size)
+        return [(bounds[i], bounds[i + 1]) for i in range(parts) if bounds[i] < bounds[i + 1]]
+
+    def records_in_range(self, start, end):
+        """Yield the records whose start offset falls in [start, end)"""
+        self._index()
+        first = bisect_left(self._starts, start)
+        data = self._map
+        for i in range(first, len(self._starts)):
+            if self._starts[i] >= end:
+                break
+            yield _decode(data[self._starts[i]:self._ends[i]])
+
+    def close(self):
+        if isinstance(self._map, mmap.mmap):
+            self._map.close()
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+        return False
+
+
+def iter_records(path, start=0, end=None):
+    """Yield the non-blank records starting in [start, end) of ``path`` without indexing the whole file
+
+    ``start`` and ``end`` must be record boundaries, as returned by ``MappedBatch.byte_ranges``.
+    This is what parallel workers call with their assigned range.
+    """
+    with open(path, "rb") as f:
+        data = _open_map(f)
+        try:
+            end = len(data) if end is None else min(end, len(data))
+            for _, text in _iter_records(data, start, end):
+                yield text
+        finally:
+            if isinstance(data, mmap.mmap):
+                data.close()
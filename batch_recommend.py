@@ -0,0 +1,132 @@
+#!/usr/bin/env python3
+"""
+Nightly batch job: precompute top-K picks for every saved user profile.
+
+Input is a JSON-lines file with one profile per line:
+
+    {"user_id": "u1", "moods": {"energetic": 7, ...}, "favorites": [6091, 286]}
+
+The catalog's mood matrix is built once and placed in
+multiprocessing.shared_memory; pool workers attach to it by name instead of
+receiving a copy. Profiles are read lazily and sent to the pool in chunks, and
+each worker scores its users with recommend.score_all (the parity-checked port
+of script.js). Favorites are excluded from a user's picks. Results are written
+as JSON lines in input order as chunks complete:
+
+    {"user_id": "u1", "picks": [{"id": 2545, "score": 7.93}, ...]}
+
+Usage:
+    python3 batch_recommend.py users.jsonl picks.jsonl [--catalog data/drinks.json]
+                               [--workers N] [--top 6] [--chunk-size 2000]
+"""
+
+import argparse
+import itertools
+import json
+import os
+import time
+from multiprocessing import Pool, shared_memory
+
+import numpy as np
+
+from recommend import MOODS, TOP_K, MoodMatrix, score_all, top_k
+
+DEFAULT_CHUNK_SIZE = 2000
+
+# Set in each worker by _attach_matrix
+_worker_shm = None
+_worker_matrix = None
+
+
+def _attach_matrix(shm_name, shape):
+    global _worker_shm, _worker_matrix
+    _worker_shm = shared_memory.SharedMemory(name=shm_name)
+    packed = np.ndarray(shape, dtype=np.float64, buffer=_worker_shm.buf)
+    _worker_matrix = MoodMatrix.from_packed(packed)
+
+
+def _score_chunk(args):
+    """Score a chunk of (user_id, moods, favorite row indices); return (user_id, rows, scores) lists"""
+    chunk, k = args
+    results = []
+    for user_id, moods, favorite_rows in chunk:
+        scores = score_all(_worker_matrix, moods)
+        rows = top_k(scores, k, exclude=favorite_rows)
+        results.append((user_id, rows.tolist(), scores[rows].tolist()))
+    return results
+
+
+def _read_profiles(path, row_by_id, default_mood=5):
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            if not line.strip():
+                continue
+            profile = json.loads(line)
+            moods = profile.get("moods", {})
+            moods = {mood: moods.get(mood, default_mood) for mood in MOODS}
+            favorite_rows = [row_by_id[favorite] for favorite in profile.get("favorites", [])
+                             if favorite in row_by_id]
+            yield profile["user_id"], moods, favorite_rows
+
+
+def _chunks(iterable, size, k):
+    iterator = iter(iterable)
+    while True:
+        chunk = list(itertools.islice(iterator, size))
+        if not chunk:
+            return
+        yield chunk, k
+
+
+def run_batch(drinks, users_path, output_path, workers=None, k=TOP_K, chunk_size=DEFAULT_CHUNK_SIZE):
+    """Write top-``k`` picks for every profile in ``users_path``; return the number of users"""
+    packed = MoodMatrix.from_drinks(drinks).packed()
+    ids = [drink.get("id") for drink in drinks]
+    row_by_id = {drink_id: row for row, drink_id in enumerate(ids)}
+
+    shm = shared_memory.SharedMemory(create=True, size=max(1, packed.nbytes))
+    try:
+        np.ndarray(packed.shape, dtype=np.float64, buffer=shm.buf)[:] = packed
+        del packed
+
+        users = 0
+        with Pool(workers, initializer=_attach_matrix, initargs=(shm.name, (len(drinks), 8))) as pool, \
+                open(output_path, "w", encoding="utf-8") as out:
+            chunks = _chunks(_read_profiles(users_path, row_by_id), chunk_size, k)
+            for results in pool.imap(_score_chunk, chunks):
+                for user_id, rows, scores in results:
+                    picks = [{"id": ids[row], "score": round(score, 4)} for row, score in zip(rows, scores)]
+                    out.write(json.dumps({"user_id": user_id, "picks": picks}))
+                    out.write("\n")
+                users += len(results)
+        return users
+    finally:
+        shm.close()
+        shm.unlink()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Precompute mood recommendations for saved user profiles")
+    parser.add_argument("users", help="JSON-lines file of user profiles")
+    parser.add_argument("output", help="JSON-lines file to write picks to")
+    parser.add_argument("--catalog", default="data/drinks.json")
+    parser.add_argument("--workers", type=int, default=os.cpu_count())
+    parser.add_argument("--top", type=int, default=TOP_K)
+    parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE)
+    args = parser.parse_args()
+
+    with open(args.catalog, "r", encoding="utf-8") as f:
+        drinks = json.load(f)
+
+    start = time.perf_counter()
+    users = run_batch(drinks, args.users, args.output, args.workers, args.top, args.chunk_size)
+    elapsed = time.perf_counter() - start
+
+    rate = users / elapsed if elapsed > 0 else 0
+    print(f"Scored {users} users against {len(drinks)} drinks with {args.workers} workers "
+          f"in {elapsed:.2f}s ({rate:.0f} users/sec)")
+    print(f"Saved to: {args.output}")
+
+
+if __name__ == "__main__":
+    main()
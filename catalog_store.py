@@ -0,0 +1,198 @@
+#!/usr/bin/env python3
+"""
+Safe concurrent reads and writes of data/drinks.json.
+
+Writers never modify the catalog in place. A new version is written to a
+temporary file in the same directory, fsynced, and atomically renamed over the
+catalog, so a crash leaves either the old or the new catalog and never a
+truncated one. Commits take an advisory fcntl lock on ``<catalog>.lock`` and
+check that the catalog is still at the version the writer read (optimistic
+concurrency): parallel ingests do their parsing and classification unlocked
+and only serialize the short commit step. A writer that lost the race gets
+CatalogConflictError, and update_catalog() re-reads and retries.
+
+    def add_drinks(drinks):
+        drinks.extend(new_drinks)
+
+    update_catalog("data/drinks.json", add_drinks)
+"""
+
+import json
+import os
+import tempfile
+from contextlib import contextmanager, nullcontext
+
+try:
+    import fcntl
+except ImportError:  # Windows: commits are still atomic, but not locked
+    fcntl = None
+
+DEFAULT_RETRIES = 5
+
+# expected_version value that skips the optimistic check
+ANY_VERSION = object()
+
+
+class CatalogConflictError(Exception):
+    """The catalog changed between read and commit"""
+
+
+def catalog_version(path):
+    """Version token for the catalog file, or None if it does not exist
+
+    Every commit renames a new file into place, so the inode changes even when
+    size and mtime happen to match.
+    """
+    try:
+        stat = os.stat(path)
+    except FileNotFoundError:
+        return None
+    return f"{stat.st_ino}-{stat.st_size}-{stat.st_mtime_ns}"
+
+
+def _version_of(fd):
+    stat = os.fstat(fd)
+    return f"{stat.st_ino}-{stat.st_size}-{stat.st_mtime_ns}"
+
+
+def read_catalog(path, missing_ok=False):
+    """Return (drinks, version); the version matches the content that was read"""
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            version = _version_of(f.fileno())
+            return json.load(f), version
+    except FileNotFoundError:
+        if not missing_ok:
+            raise
+        return [], None
+
+
+@contextmanager
+def catalog_lock(path):
+    """Hold an exclusive advisory lock for the catalog at ``path``"""
+    with open(path + ".lock", "a") as lock_file:
+        if fcntl is not None:
+            fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            if fcntl is not None:
+                fcntl.flock(lock_file.fileno(), fcntl.LOCK_UN)
+
+
+def _fsync_directory(path):
+    if not hasattr(os, "O_DIRECTORY"):
+        return
+    fd = os.open(os.path.dirname(os.path.abspath(path)), os.O_RDONLY | os.O_DIRECTORY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+def temp_path_for(path):
+    """Create an empty temporary file next to ``path`` and return its name"""
+    fd, tmp_path = tempfile.mkstemp(prefix=".drinks-", suffix=".tmp",
+                                    dir=os.path.dirname(os.path.abspath(path)))
+    os.close(fd)
+    return tmp_path
+
+
+def commit_file(tmp_path, path, expected_version=ANY_VERSION):
+    """Atomically replace ``path`` with the finished file ``tmp_path``; return the new version
+
+    Raises CatalogConflictError (and removes ``tmp_path``) if the catalog is no
+    longer at ``expected_version``.
+    """
+    try:
+        with open(tmp_path, "rb+") as f:
+            os.fsync(f.fileno())
+        with catalog_lock(path):
+            current = catalog_version(path)
+            if expected_version is not ANY_VERSION and current != expected_version:
+                raise CatalogConflictError(
+                    f"{path} changed since it was read (expected {expected_version}, found {current})")
+            os.replace(tmp_path, path)
+            _fsync_directory(path)
+            return catalog_version(path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+def write_catalog(path, drinks, expected_version=ANY_VERSION, indent=2, ensure_ascii=True):
+    """Serialize ``drinks`` and commit them atomically; return the new version"""
+    tmp_path = temp_path_for(path)
+    try:
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(drinks, f, indent=indent, ensure_ascii=ensure_ascii)
+    except BaseException:
+        os.remove(tmp_path)
+        raise
+    return commit_file(tmp_path, path, expected_version)
+
+
+def update_catalog(path, update, retries=DEFAULT_RETRIES, missing_ok=False, metrics=None,
+                   indent=2, ensure_ascii=True):
+    """Read the catalog, apply ``update(drinks)`` and commit, retrying on conflicts
+
+    ``update`` may mutate the list in place; its return value is passed back.
+    It can run more than once, so it must not have side effects besides the
+    list: return any counts and record them after this returns. With
+    ``metrics`` (an IngestMetrics), reading and committing are timed as the
+    "read" and "serialize" stages; every attempt adds time, only the committed
+    one adds rows.
+    """
+    for attempt in range(retries + 1):
+        if metrics is None:
+            drinks, version = read_catalog(path, missing_ok)
+        else:
+            with metrics.stage("read"):
+                drinks, version = read_catalog(path, missing_ok)
+        read_rows = len(drinks)
+
+        result = update(drinks)
+
+        try:
+            if metrics is None:
+                write_catalog(path, drinks, version, indent, ensure_ascii)
+            else:
+                with metrics.stage("serialize") as stage:
+                    write_catalog(path, drinks, version, indent, ensure_ascii)
+                    stage.add_rows(len(drinks))
+                metrics.get_stage("read").add_rows(read_rows)
+            return result
+        except CatalogConflictError:
+            if attempt == retries:
+                raise
+            print(f"{path} was updated by another writer, retrying ({attempt + 1}/{retries})")
+
+
+def append_new_drinks(path, new_drinks, key, retries=DEFAULT_RETRIES, missing_ok=False, metrics=None,
+                      indent=2, ensure_ascii=True):
+    """Append the drinks whose ``key(drink)`` is not in the catalog yet; return (added, catalog)
+
+    Drinks repeating a key earlier in ``new_drinks`` are dropped as well. The
+    dedupe runs inside update_catalog(), so it is redone against the fresh
+    catalog on a retry; with ``metrics`` it is timed as the "dedupe" stage and
+    its rows and skipped drinks are counted once, for the committed attempt.
+    """
+    def add_unique(drinks):
+        with metrics.stage("dedupe") if metrics is not None else nullcontext():
+            seen = {key(drink) for drink in drinks}
+            added = []
+            for drink in new_drinks:
+                drink_key = key(drink)
+                if drink_key not in seen:
+                    seen.add(drink_key)
+                    added.append(drink)
+        drinks.extend(added)
+        return added, drinks
+
+    added, drinks = update_catalog(path, add_unique, retries, missing_ok, metrics, indent, ensure_ascii)
+    if metrics is not None:
+        dedupe = metrics.get_stage("dedupe")
+        dedupe.add_rows(len(new_drinks))
+        dedupe.add_skipped(len(new_drinks) - len(added))
+    return added, drinks
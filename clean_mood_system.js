@@ -336,7 +336,9 @@ class CleanMoodSystem {
                 
                 <div class="drink-preview">
                     <div class="drink-image">
-                        <div class="drink-icon">🍸</div>
+                        ${drink.image
+                            ? `<img src="${drink.image}" alt="" width="80" height="80" loading="lazy">`
+                            : '<div class="drink-icon">🍸</div>'}
                     </div>
                     <div class="drink-info">
                         <p class="drink-description">${drink.description}</p>
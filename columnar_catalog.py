@@ -0,0 +1,338 @@
+#!/usr/bin/env python3
+"""
+Columnar binary copy of the catalog for fast loading.
+
+data/drinks.json repeats every key per drink and stores moods as nested
+objects, so parsing it dominates tool startup. This stage writes the same
+drinks column by column to data/drinks.bin:
+
+    MAGIC | header length (uint32 LE) | JSON header | pad | column blocks
+
+The header lists every block as name -> [dtype, shape, offset from the first
+block]; each block starts on an 8-byte boundary. Columns:
+
+    id                      int64 (N,)
+    moods                   uint8 (N, 6) in recommend.MOODS order: 1 + the mood
+                            in units of 1 / MOOD_SCALE (exact for the half and
+                            quarter steps the batches use), so 0 to MAX_MOOD
+                            fit and 0 stays free for a missing mood
+    spirit, difficulty      uint8 (N,) codes into the header's enum lists, 255 = missing
+    glass, category         uint32 (N,) indices into the string table, MISSING_STRING = none
+    ingredients.offsets     uint64 (N + 1,) slices of ingredients.values per drink
+    ingredients.values      uint32 string-table indices
+    percents, flags         the feature columns (see feature_columns.py)
+    <text>.offsets/.data    uint64 (N + 1,) byte offsets into UTF-8 data, for
+                            name, description, flavor, instructions, garnish
+                            (a garnish list is joined with ", "), image
+    strings.offsets/.data   the string table: every distinct glass, category
+                            and ingredient, stored once
+
+ColumnarCatalog memory-maps the file and exposes each block as a read-only
+NumPy view of the mapping, so opening it costs a header parse no matter how
+many drinks it holds; strings are decoded only when asked for. Fields not
+listed above (source_scores, etc.) stay in drinks.json only.
+
+Usage:
+    python3 columnar_catalog.py [--catalog data/drinks.json] [--output data/drinks.bin]
+"""
+
+import argparse
+import json
+import mmap
+import os
+import struct
+import time
+
+import numpy as np
+
+from catalog_store import temp_path_for
+from feature_columns import FeatureColumns
+from recommend import MOODS
+
+MAGIC = b"TDCOLS\x00\x00"
+FORMAT_VERSION = 2
+ENUM_COLUMNS = ("spirit", "difficulty")
+TABLE_COLUMNS = ("glass", "category")
+TEXT_COLUMNS = ("name", "description", "flavor", "instructions", "garnish", "image")
+
+# Mood values are stored as 1 + round(value * MOOD_SCALE): 0.05 steps from 0
+# to MAX_MOOD; MISSING_MOOD marks a drink without that mood
+MOOD_SCALE = 20
+MISSING_MOOD = 0
+MAX_MOOD = (255 - 1) / MOOD_SCALE
+MISSING_ENUM = 255
+MISSING_STRING = 0xFFFFFFFF
+_ALIGN = 8
+
+
+def _text_column(values):
+    """(offsets, data) arrays for a list of optional strings; None is stored as ""."""
+    encoded = [(value or "").encode("utf-8") for value in values]
+    offsets = np.zeros(len(encoded) + 1, dtype=np.uint64)
+    np.cumsum([len(item) for item in encoded], out=offsets[1:])
+    return offsets, np.frombuffer(b"".join(encoded), dtype=np.uint8)
+
+
+def build_columns(drinks):
+    """Return (header fields, {block name: array}) for a catalog"""
+    size = len(drinks)
+    blocks = {}
+    header = {"version": FORMAT_VERSION, "rows": size, "moods": list(MOODS), "mood_scale": MOOD_SCALE,
+              "enums": {}}
+
+    blocks["id"] = np.array([int(drink["id"]) for drink in drinks], dtype=np.int64)
+
+    moods = np.full((size, len(MOODS)), MISSING_MOOD, dtype=np.uint8)
+    for row, drink in enumerate(drinks):
+        drink_moods = drink.get("moods") or {}
+        for column, mood in enumerate(MOODS):
+            value = drink_moods.get(mood)
+            if value is None:
+                continue
+            if not 0 <= value <= MAX_MOOD:
+                raise ValueError(f"Drink {drink.get('id')} ({drink.get('name')}): {mood} mood {value!r} "
+                                 f"is outside the 0 to {MAX_MOOD} the columnar format can store")
+            moods[row, column] = 1 + round(value * MOOD_SCALE)
+    blocks["moods"] = moods
+
+    for column in ENUM_COLUMNS:
+        values = sorted({drink[column] for drink in drinks if drink.get(column)})
+        if len(values) >= MISSING_ENUM:
+            raise ValueError(f"{column} has {len(values)} distinct values, too many for a uint8 enum")
+        code = {value: i for i, value in enumerate(values)}
+        header["enums"][column] = values
+        blocks[column] = np.array([code.get(drink.get(column), MISSING_ENUM) for drink in drinks],
+                                  dtype=np.uint8)
+
+    # Shared string table for glasses, categories and ingredients
+    table = {}
+
+    def intern(value):
+        if value not in table:
+            table[value] = len(table)
+        return table[value]
+
+    for column in TABLE_COLUMNS:
+        blocks[column] = np.array([intern(drink[column]) if drink.get(column) else MISSING_STRING
+                                   for drink in drinks], dtype=np.uint32)
+
+    ingredient_offsets = np.zeros(size + 1, dtype=np.uint64)
+    ingredient_values = []
+    for row, drink in enumerate(drinks):
+        ingredient_values.extend(intern(name) for name in drink.get("ingredients") or ())
+        ingredient_offsets[row + 1] = len(ingredient_values)
+    blocks["ingredients.offsets"] = ingredient_offsets
+    blocks["ingredients.values"] = np.array(ingredient_values, dtype=np.uint32)
+
+    features = FeatureColumns.from_drinks(drinks)
+    blocks["percents"] = features.percents
+    blocks["flags"] = features.flags
+
+    for column in TEXT_COLUMNS:
+        values = [drink.get(column) for drink in drinks]
+        # Older ingests store garnish as a list; it is only ever displayed as text
+        values = [", ".join(value) if isinstance(value, list) else value for value in values]
+        blocks[f"{column}.offsets"], blocks[f"{column}.data"] = _text_column(values)
+    blocks["strings.offsets"], blocks["strings.data"] = _text_column(list(table))
+    return header, blocks
+
+
+def _padding(position):
+    return -position % _ALIGN
+
+
+def write_columnar(drinks, path):
+    """Write the columnar catalog for ``drinks`` to ``path``; return its size in bytes
+
+    The file is written next to ``path`` and renamed over it, so readers that
+    have the old file mapped keep a consistent view.
+    """
+    header, blocks = build_columns(drinks)
+    header["columns"] = {}
+    offset = 0
+    for name, array in blocks.items():
+        offset += _padding(offset)
+        header["columns"][name] = [array.dtype.str, list(array.shape), offset]
+        offset += array.nbytes
+    header_bytes = json.dumps(header, separators=(",", ":"), ensure_ascii=False).encode("utf-8")
+
+    tmp_path = temp_path_for(path)
+    try:
+        with open(tmp_path, "wb") as f:
+            f.write(MAGIC)
+            f.write(struct.pack("<I", len(header_bytes)))
+            f.write(header_bytes)
+            f.write(b"\0" * _padding(f.tell()))
+            start = f.tell()
+            for name, array in blocks.items():
+                f.write(b"\0" * _padding(f.tell() - start))
+                f.write(np.ascontiguousarray(array).tobytes())
+            size = f.tell()
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+    return size
+
+
+def _mood_value(stored, scale):
+    value = (stored - 1) / scale
+    return int(value) if value.is_integer() else value
+
+
+class ColumnarCatalog:
+    """Read-only, memory-mapped view of a columnar catalog
+
+    Numeric columns (``ids``, ``moods``, ``spirit``, ``glass``, ...) are NumPy
+    views of the mapping and are never copied; a view keeps the mapping alive
+    after close().
+    """
+
+    def __init__(self, path):
+        with open(path, "rb") as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        buffer = self._mmap
+        if buffer[:len(MAGIC)] != MAGIC:
+            self._mmap.close()
+            raise ValueError(f"{path} is not a columnar catalog")
+        header_start = len(MAGIC) + 4
+        (header_length,) = struct.unpack_from("<I", buffer, len(MAGIC))
+        header = json.loads(bytes(buffer[header_start:header_start + header_length]))
+        if header["version"] != FORMAT_VERSION:
+            self._mmap.close()
+            raise ValueError(f"{path} has format version {header['version']}, expected {FORMAT_VERSION}")
+        data_start = header_start + header_length
+        data_start += _padding(data_start)
+
+        self.rows = header["rows"]
+        self.mood_names = tuple(header["moods"])
+        self.mood_scale = header["mood_scale"]
+        self.enums = header["enums"]
+        self.columns = {}
+        for name, (dtype, shape, offset) in header["columns"].items():
+            count = int(np.prod(shape)) if shape else 1
+            self.columns[name] = np.frombuffer(buffer, dtype=dtype, count=count,
+                                               offset=data_start + offset).reshape(shape)
+
+        self.ids = self.columns["id"]
+        self.moods = self.columns["moods"]
+        self.percents = self.columns["percents"]
+        self.flags = self.columns["flags"]
+
+    @classmethod
+    def open(cls, path):
+        return cls(path)
+
+    def close(self):
+        self.columns = {}
+        self.ids = self.moods = self.percents = self.flags = None
+        try:
+            self._mmap.close()
+        except BufferError:
+            # Views handed out earlier still reference the mapping; it is
+            # unmapped when the last of them is garbage-collected
+            pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def __len__(self):
+        return self.rows
+
+    def _text(self, column, index):
+        offsets = self.columns[f"{column}.offsets"]
+        start, end = int(offsets[index]), int(offsets[index + 1])
+        return self.columns[f"{column}.data"][start:end].tobytes().decode("utf-8")
+
+    def string(self, index):
+        """Entry ``index`` of the shared string table"""
+        return self._text("strings", index)
+
+    def text(self, column, row):
+        """Value of a text column (name, instructions, ...) for one drink; "" if missing"""
+        return self._text(column, row)
+
+    def enum_value(self, column, row):
+        code = int(self.columns[column][row])
+        return None if code == MISSING_ENUM else self.enums[column][code]
+
+    def table_value(self, column, row):
+        index = int(self.columns[column][row])
+        return None if index == MISSING_STRING else self.string(index)
+
+    def ingredients(self, row):
+        offsets = self.columns["ingredients.offsets"]
+        codes = self.columns["ingredients.values"][int(offsets[row]):int(offsets[row + 1])]
+        return [self.string(int(code)) for code in codes]
+
+    def enum_mask(self, column, value):
+        """Boolean row mask of drinks whose ``spirit``/``difficulty`` is ``value``"""
+        try:
+            code = self.enums[column].index(value)
+        except ValueError:
+            return np.zeros(self.rows, dtype=bool)
+        return self.columns[column] == code
+
+    def mood_values(self):
+        """Moods as a float32 (N, 6) array in slider units (a copy; NaN = missing)"""
+        values = (self.moods.astype(np.float32) - 1) / self.mood_scale
+        values[self.moods == MISSING_MOOD] = np.nan
+        return values
+
+    def feature_columns(self):
+        """FeatureColumns over the mapped ids, percentages and flags, without copying"""
+        return FeatureColumns(self.ids, self.percents, self.flags)
+
+    def drink(self, row):
+        """Rebuild the stored fields of one drink as a catalog dict"""
+        drink = {"id": int(self.ids[row])}
+        for column in TEXT_COLUMNS:
+            value = self.text(column, row)
+            if value:
+                drink[column] = value
+        for column in ENUM_COLUMNS:
+            value = self.enum_value(column, row)
+            if value is not None:
+                drink[column] = value
+        for column in TABLE_COLUMNS:
+            value = self.table_value(column, row)
+            if value is not None:
+                drink[column] = value
+        drink["ingredients"] = self.ingredients(row)
+        moods = self.moods[row]
+        if (moods != MISSING_MOOD).any():
+            drink["moods"] = {mood: _mood_value(int(value), self.mood_scale)
+                              for mood, value in zip(self.mood_names, moods) if value != MISSING_MOOD}
+        return drink
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Write the memory-mappable columnar catalog")
+    parser.add_argument("--catalog", default="data/drinks.json")
+    parser.add_argument("--output", default="data/drinks.bin")
+    args = parser.parse_args(argv)
+
+    start = time.perf_counter()
+    with open(args.catalog, "r", encoding="utf-8") as f:
+        drinks = json.load(f)
+    json_elapsed = time.perf_counter() - start
+
+    size = write_columnar(drinks, args.output)
+
+    start = time.perf_counter()
+    with ColumnarCatalog(args.output) as catalog:
+        open_elapsed = time.perf_counter() - start
+        rows = len(catalog)
+
+    json_size = os.path.getsize(args.catalog)
+    print(f"Wrote {rows} drinks in {size:,} bytes ({size / json_size:.0%} of {args.catalog})")
+    print(f"Load: {json_elapsed * 1000:.1f} ms for JSON, {open_elapsed * 1000:.2f} ms to map the columns")
+    print(f"Saved to: {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,177 @@
+#!/usr/bin/env python3
+"""
+Sparse drink-to-drink similarity for diversity reranking.
+
+Two drinks are similar when their mood profiles and their ingredients are:
+
+    similarity = 0.5 * mood similarity + 0.5 * ingredient Jaccard
+
+Mood similarity is 1 - mean |difference| / 9 over the six slider moods (only
+when both drinks have moods); the ingredient part is the Jaccard index of the
+canonical ingredient sets, computed with the sparse incidence matrix from
+ingredient_pairs.py. Rows are processed in blocks so the dense N x N matrix
+is never held. Only drinks whose ingredient Jaccard is at least MIN_JACCARD
+count as similar: mood closeness alone says little, as drinks recommended
+together already share a mood profile. Pairs are then kept strongest first
+while both drinks have fewer than NEIGHBORS partners, so the result is
+symmetric and no drink has more than NEIGHBORS; any pair not stored counts
+as dissimilar. recommend.rerank_diverse() and script.js look pairs up in the
+artifact (data/drink_similarity.json) instead of comparing drinks at query
+time.
+
+Usage:
+    python3 drink_similarity.py [--catalog data/drinks.json] [--output data/drink_similarity.json]
+                                [--neighbors 40] [--min-jaccard 0.2]
+"""
+
+import argparse
+import json
+import time
+
+import numpy as np
+
+from ingredient_pairs import build_incidence
+from recommend import MoodMatrix
+
+ARTIFACT_VERSION = 1
+NEIGHBORS = 40
+MIN_JACCARD = 0.2
+MOOD_WEIGHT = 0.5
+INGREDIENT_WEIGHT = 0.5
+
+# Cap on block rows x catalog size, so each dense (rows, N) block array
+# stays around 16 MB
+_BLOCK_CELLS = 2_000_000
+
+
+def similarity_block(matrix, incidence, sizes, rows, min_jaccard=MIN_JACCARD):
+    """Dense (len(rows), N) similarity of ``rows`` against the whole catalog
+
+    Pairs whose ingredient Jaccard is below ``min_jaccard`` are 0.
+    """
+    values = matrix.values
+    # Mean absolute difference, one mood column at a time to avoid an (rows, N, 6) temporary
+    distance = np.zeros((len(rows), len(values)), dtype=np.float64)
+    for column in range(values.shape[1]):
+        distance += np.abs(values[rows, column, None] - values[None, :, column])
+    mood = 1 - distance / (values.shape[1] * 9)
+    mood[~matrix.has_moods[rows]] = 0
+    mood[:, ~matrix.has_moods] = 0
+
+    shared = (incidence[rows] @ incidence.T).toarray()
+    union = sizes[rows, None] + sizes[None, :] - shared
+    jaccard = np.divide(shared, union, out=np.zeros_like(shared, dtype=np.float64), where=union > 0)
+
+    similarity = MOOD_WEIGHT * mood + INGREDIENT_WEIGHT * jaccard
+    similarity[jaccard < min_jaccard] = 0
+    similarity[np.arange(len(rows)), rows] = 0
+    return similarity
+
+
+def build_neighbors(drinks, neighbors=NEIGHBORS, min_jaccard=MIN_JACCARD):
+    """Return per-row {neighbor row: similarity} dicts, symmetric and at most ``neighbors`` long"""
+    matrix = MoodMatrix.from_drinks(drinks)
+    _, incidence = build_incidence(drinks)
+    incidence = (incidence > 0).astype(np.float64).tocsr()
+    sizes = np.asarray(incidence.sum(axis=1)).ravel()
+
+    total = len(drinks)
+    result = [{} for _ in range(total)]
+    keep = min(neighbors, total - 1)
+    if keep <= 0:
+        return result
+
+    # Each row's strongest candidates, as (low row, high row) -> similarity
+    candidates = {}
+    block = max(1, _BLOCK_CELLS // max(1, total))
+    for start in range(0, total, block):
+        rows = np.arange(start, min(total, start + block))
+        similarity = similarity_block(matrix, incidence, sizes, rows, min_jaccard)
+        top = np.argpartition(-similarity, keep - 1, axis=1)[:, :keep]
+        for offset, row in enumerate(rows):
+            for col in top[offset]:
+                value = similarity[offset, col]
+                if value > 0:
+                    pair = (int(row), int(col)) if row < col else (int(col), int(row))
+                    candidates[pair] = round(float(value), 3)
+
+    # Strongest pairs first, each only while both drinks have room
+    for (row, col), value in sorted(candidates.items(), key=lambda item: (-item[1], item[0])):
+        if len(result[row]) < keep and len(result[col]) < keep:
+            result[row][col] = value
+            result[col][row] = value
+    return result
+
+
+def build_similarity_artifact(drinks, neighbors=NEIGHBORS, min_jaccard=MIN_JACCARD):
+    pairs = build_neighbors(drinks, neighbors, min_jaccard)
+    return {
+        "version": ARTIFACT_VERSION,
+        "ids": [drink.get("id") for drink in drinks],
+        # neighbors[row] = [neighbor row, similarity, neighbor row, similarity, ...]
+        "neighbors": [[value for col in sorted(row) for value in (col, row[col])] for row in pairs],
+    }
+
+
+class DrinkSimilarity:
+    """Pairwise similarity lookups by catalog row
+
+    Built from the artifact; with ``drinks``, rows are remapped by id to that
+    catalog's order, and drinks missing from the artifact have no neighbors.
+    """
+
+    def __init__(self, artifact, drinks=None):
+        ids = artifact["ids"]
+        if drinks is None:
+            remap = list(range(len(ids)))
+            size = len(ids)
+        else:
+            row_by_id = {drink.get("id"): row for row, drink in enumerate(drinks)}
+            remap = [row_by_id.get(drink_id) for drink_id in ids]
+            size = len(drinks)
+        self.neighbors = [{} for _ in range(size)]
+        for source, flat in enumerate(artifact["neighbors"]):
+            row = remap[source]
+            if row is None:
+                continue
+            for i in range(0, len(flat), 2):
+                col = remap[flat[i]]
+                if col is not None:
+                    self.neighbors[row][col] = flat[i + 1]
+
+    @classmethod
+    def load(cls, path, drinks=None):
+        with open(path, "r", encoding="utf-8") as f:
+            return cls(json.load(f), drinks)
+
+    def get(self, row, other):
+        """Similarity of two catalog rows; 0 if the pair was not kept"""
+        return self.neighbors[row].get(other, 0.0)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Build the sparse drink similarity artifact")
+    parser.add_argument("--catalog", default="data/drinks.json")
+    parser.add_argument("--output", default="data/drink_similarity.json")
+    parser.add_argument("--neighbors", type=int, default=NEIGHBORS, help="neighbors kept per drink")
+    parser.add_argument("--min-jaccard", type=float, default=MIN_JACCARD,
+                        help="ingredient overlap below which drinks count as dissimilar")
+    args = parser.parse_args(argv)
+
+    with open(args.catalog, "r", encoding="utf-8") as f:
+        drinks = json.load(f)
+
+    start = time.perf_counter()
+    artifact = build_similarity_artifact(drinks, args.neighbors, args.min_jaccard)
+    elapsed = time.perf_counter() - start
+
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(artifact, f, separators=(",", ":"))
+
+    pairs = sum(len(row) for row in artifact["neighbors"]) // 4
+    print(f"Kept {pairs} similar pairs for {len(drinks)} drinks in {elapsed:.2f}s")
+    print(f"Saved to: {args.output}")
+
+
+if __name__ == "__main__":
+    main()
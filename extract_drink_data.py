@@ -1,17 +1,31 @@
 #!/usr/bin/env python3
 """
 Extract drink data from the Excel file and convert to JSON format for ThinkDrink app
+
+Usage:
+    python3 extract_drink_data.py [excel_path] [output_path]
 """
 
-import pandas as pd
 import json
+import os
 import sys
-from pathlib import Path
 
-def extract_drink_data():
+from placeholder_images import build_placeholders, write_precache_manifest
+
+DEFAULT_EXCEL_PATH = "data/Drink Think v2.41.xlsx"
+DEFAULT_OUTPUT_PATH = "data/drink_think_data.json"
+# Placeholder images always go to the app's data/images/, wherever the
+# extracted JSON is written, so their URLs resolve from the app root
+IMAGES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "images")
+IMAGES_URL_PREFIX = "data/images/"
+
+def extract_drink_data(excel_path=DEFAULT_EXCEL_PATH, output_path=DEFAULT_OUTPUT_PATH):
     """Extract drink data from the Excel file and convert to JSON"""
+    # pandas takes a few hundred milliseconds to import, so only load it
+    # when there is a workbook to read
+    import pandas as pd
     
-    excel_path = "/Users/craigdalessio/Downloads/Drink Think v2.41.xlsx"
+    from merge_drink_data import extract_spirit
     
     try:
         print(f"Reading Excel file: {excel_path}")
@@ -60,20 +74,26 @@ def extract_drink_data():
                 "alcoholic": str(row['d_alcohol']).strip() if not pd.isna(row['d_alcohol']) else "Alcoholic",
                 "glass": str(row['d_glass']).strip() if not pd.isna(row['d_glass']) else "Any Glass",
                 "ingredients": ingredients,
+                # Same rule as merge_drink_data.convert_drink, so the placeholder gets the spirit's colors
+                "spirit": extract_spirit(ingredients),
                 "instructions": str(row['d_instructions']).strip() if not pd.isna(row['d_instructions']) else "",
                 "shopping_list": shopping,
-                "mood_scores": mood_scores,
-                "image": f"https://via.placeholder.com/300x200?text={str(row['d_name']).replace(' ', '+')}"
+                "mood_scores": mood_scores
             }
             
             drinks_data.append(drink)
         
+        # Generate local placeholder images in one pass instead of remote URLs
+        images = build_placeholders(drinks_data, IMAGES_DIR, IMAGES_URL_PREFIX)
+        # The workbook is only part of the catalog: add to the manifest rather than replace it
+        write_precache_manifest(IMAGES_DIR, images, keep_existing=True)
+        
         # Save to JSON
-        output_path = "/Users/craigdalessio/thinkdrink-app/data/drink_think_data.json"
         with open(output_path, 'w', encoding='utf-8') as f:
             json.dump(drinks_data, f, indent=2, ensure_ascii=False)
         
         print(f"\nExtracted {len(drinks_data)} drinks")
+        print(f"Generated {len(images)} placeholder images")
         print(f"Saved to: {output_path}")
         
         # Show sample of extracted data
@@ -94,4 +114,7 @@ def extract_drink_data():
         return None
 
 if __name__ == "__main__":
-    extract_drink_data()
+    if len(sys.argv) > 1:
+        extract_drink_data(*sys.argv[1:3])
+    else:
+        extract_drink_data()
@@ -1,17 +1,21 @@
 #!/usr/bin/env python3
 """
 Extract data from Drink Think v2.41 Excel file and convert to JSON format
+
+Usage:
+    python3 extract_excel_data.py [excel_path] [output_path]
 """
 
-import pandas as pd
 import json
 import sys
 from pathlib import Path
 
-def extract_excel_data():
+DEFAULT_EXCEL_PATH = "data/Drink Think v2.41.xlsx"
+DEFAULT_OUTPUT_PATH = "data/drink_think_data.json"
+
+def extract_excel_data(excel_path=DEFAULT_EXCEL_PATH, output_path=DEFAULT_OUTPUT_PATH):
     """Extract data from the Excel file and convert to JSON"""
-    
-    excel_path = "/Users/craigdalessio/Downloads/Drink Think v2.41.xlsx"
+    import pandas as pd  # deferred, like extract_drink_data.py
     
     try:
         # Read the Excel file with different parameters
@@ -79,7 +83,6 @@ def extract_excel_data():
             drinks_data.append(drink)
         
         # Save to JSON
-        output_path = "/Users/craigdalessio/thinkdrink-app/data/drink_think_data.json"
         with open(output_path, 'w', encoding='utf-8') as f:
             json.dump(drinks_data, f, indent=2, ensure_ascii=False)
         
@@ -98,4 +101,7 @@ def extract_excel_data():
         return None
 
 if __name__ == "__main__":
-    extract_excel_data()
+    if len(sys.argv) > 1:
+        extract_excel_data(*sys.argv[1:3])
+    else:
+        extract_excel_data()
@@ -0,0 +1,228 @@
+#!/usr/bin/env python3
+"""
+Precomputed facet index for the spirit, difficulty, glass and category filters.
+
+The artifact (data/facet_index.json) stores, for every value of every facet,
+the sorted list of drink ids with that value and its count:
+
+    facets  facet -> value -> [sorted drink ids]
+    counts  facet -> value -> number of drinks
+    fingerprint  catalog_fingerprint() of the catalog the index was built from
+
+Values are matched case-insensitively ("Cocktail glass" and "Cocktail Glass"
+are one value, shown with the most common spelling); drinks without a value
+are left out of that facet. A filter selection is resolved by intersecting the
+id lists of the selected facets (several values of one facet are a union)
+instead of scanning the catalog, and the counts shown next to each value are
+that value's list intersected with the selection on the other facets.
+script.js does the same lookups in the browser, once it has checked the
+fingerprint against the catalog it loaded. Lists address drinks by id, so a
+catalog that repeats an id is rejected.
+
+Usage:
+    python3 facet_index.py [--catalog data/drinks.json] [--output data/facet_index.json]
+    python3 facet_index.py --filter spirit=Gin --filter difficulty=Easy
+"""
+
+import argparse
+import json
+import time
+from bisect import bisect_left
+from collections import Counter
+
+ARTIFACT_VERSION = 2
+FACETS = ("spirit", "difficulty", "glass", "category")
+
+
+def facet_key(value):
+    """Case- and whitespace-insensitive key of a facet value, or None if empty"""
+    if not isinstance(value, str):
+        return None
+    key = " ".join(value.split()).casefold()
+    return key or None
+
+
+def catalog_fingerprint(drinks):
+    """32-bit FNV-1a hash of the catalog's ids, comma-joined in catalog order
+
+    script.js computes the same hash to tell whether the index was built from
+    the catalog it loaded.
+    """
+    fingerprint = 0x811C9DC5
+    for char in ",".join(str(drink.get("id")) for drink in drinks):
+        fingerprint = ((fingerprint ^ ord(char)) * 0x01000193) & 0xFFFFFFFF
+    return fingerprint
+
+
+def build_facet_index(drinks, facets=FACETS):
+    """Return the facet index artifact for a catalog
+
+    Raises ValueError if two drinks share an id.
+    """
+    id_counts = Counter(drink.get("id") for drink in drinks)
+    duplicates = [drink_id for drink_id, count in id_counts.items() if count > 1]
+    if duplicates:
+        raise ValueError(f"Drink ids {', '.join(map(str, duplicates[:10]))} appear more than once; "
+                         "the facet index addresses drinks by id")
+
+    index = {}
+    counts = {}
+    for facet in facets:
+        ids_by_key = {}
+        spellings = {}
+        for drink in drinks:
+            value = drink.get(facet)
+            key = facet_key(value)
+            if key is None:
+                continue
+            ids_by_key.setdefault(key, []).append(drink.get("id"))
+            spelling = " ".join(value.split())
+            seen = spellings.setdefault(key, {})
+            seen[spelling] = seen.get(spelling, 0) + 1
+        values = {}
+        for key, ids in ids_by_key.items():
+            # Most common spelling; dicts keep insertion order, so ties go to the first seen
+            display = max(spellings[key], key=spellings[key].get)
+            values[display] = sorted(ids)
+        index[facet] = dict(sorted(values.items()))
+        counts[facet] = {value: len(ids) for value, ids in index[facet].items()}
+
+    return {
+        "version": ARTIFACT_VERSION,
+        "size": len(drinks),
+        "fingerprint": catalog_fingerprint(drinks),
+        "facets": index,
+        "counts": counts,
+    }
+
+
+def intersect_sorted(a, b):
+    """Intersection of two sorted id lists
+
+    Each id of the shorter list is binary-searched in the longer one from the
+    previous match on, so a small selection against a large facet costs
+    O(small * log large).
+    """
+    if len(a) > len(b):
+        a, b = b, a
+    result = []
+    position = 0
+    end = len(b)
+    for value in a:
+        position = bisect_left(b, value, position)
+        if position == end:
+            break
+        if b[position] == value:
+            result.append(value)
+            position += 1
+    return result
+
+
+class FacetIndex:
+    """Filter selections and facet counts over a facet index artifact"""
+
+    def __init__(self, artifact):
+        self.size = artifact["size"]
+        self.facets = artifact["facets"]
+        self.counts = artifact["counts"]
+        # Lookup of a requested value by its key, so filters match case-insensitively
+        self._values = {facet: {facet_key(value): value for value in values}
+                        for facet, values in self.facets.items()}
+
+    @classmethod
+    def load(cls, path):
+        with open(path, "r", encoding="utf-8") as f:
+            return cls(json.load(f))
+
+    def ids_for(self, facet, values):
+        """Sorted ids matching any of ``values`` (a string or a list) of ``facet``"""
+        if facet not in self.facets:
+            raise ValueError(f"unknown facet {facet!r} (expected one of {', '.join(self.facets)})")
+        if isinstance(values, str):
+            values = [values]
+        lists = []
+        for value in values:
+            display = self._values[facet].get(facet_key(value))
+            if display is not None:
+                lists.append(self.facets[facet][display])
+        if len(lists) == 1:
+            return lists[0]
+        return sorted({drink_id for ids in lists for drink_id in ids})
+
+    def select(self, filters):
+        """Sorted ids of drinks matching every facet in ``filters``; None means no filter
+
+        ``filters`` maps facet names to a value or a list of values; "all",
+        None and empty lists leave that facet unfiltered.
+        """
+        lists = [self.ids_for(facet, values) for facet, values in filters.items()
+                 if values and values != "all"]
+        if not lists:
+            return None
+        lists.sort(key=len)
+        result = lists[0]
+        for ids in lists[1:]:
+            if not result:
+                break
+            result = intersect_sorted(result, ids)
+        return result
+
+    def facet_counts(self, filters):
+        """Count of every facet value within the selection on the other facets
+
+        With no other facet filtered, these are the precomputed counts.
+        """
+        result = {}
+        for facet, values in self.facets.items():
+            others = {name: value for name, value in filters.items() if name != facet}
+            selection = self.select(others)
+            if selection is None:
+                result[facet] = dict(self.counts[facet])
+            else:
+                result[facet] = {value: len(intersect_sorted(selection, ids)) for value, ids in values.items()}
+        return result
+
+
+def _filters(items):
+    filters = {}
+    for item in items:
+        facet, value = item.split("=", 1)
+        filters.setdefault(facet, []).append(value)
+    return filters
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Build and query the facet filter index")
+    parser.add_argument("--catalog", default="data/drinks.json")
+    parser.add_argument("--output", default="data/facet_index.json")
+    parser.add_argument("--filter", action="append", default=[], metavar="FACET=VALUE",
+                        help="query the built index instead of building it; repeat a facet for OR")
+    args = parser.parse_args(argv)
+
+    if not args.filter:
+        with open(args.catalog, "r", encoding="utf-8") as f:
+            drinks = json.load(f)
+        artifact = build_facet_index(drinks)
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(artifact, f, separators=(",", ":"), ensure_ascii=False)
+        values = sum(len(counts) for counts in artifact["counts"].values())
+        print(f"Indexed {len(drinks)} drinks under {values} values of {len(artifact['facets'])} facets")
+        print(f"Saved to: {args.output}")
+        return
+
+    index = FacetIndex.load(args.output)
+    filters = _filters(args.filter)
+    start = time.perf_counter()
+    ids = index.select(filters)
+    counts = index.facet_counts(filters)
+    elapsed = time.perf_counter() - start
+
+    print(f"{len(ids)} of {index.size} drinks match ({elapsed * 1000:.2f} ms)")
+    print(ids[:50])
+    for facet, values in counts.items():
+        shown = ", ".join(f"{value} ({count})" for value, count in values.items() if count)
+        print(f"  {facet}: {shown}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,193 @@
+#!/usr/bin/env python3
+"""
+Typed feature columns from the batch percentage and "x" flag fields.
+
+After the five mood numbers and their total (columns 8-13), every TSV batch
+row carries seven percentage columns (the first five are each mood's share of
+the total) and up to six "x" flag columns. Ingest stores them per drink as
+
+    "features": {"percents": [29, 14, 22, 9, 26, 34, 87], "flags": 23}
+
+where bit i of ``flags`` is set when flag column i holds an "x".
+FeatureColumns loads the catalog's features into a uint8 (N, 7) percentage
+array and a uint8 flag bitmask per drink, so a filter over any combination of
+flags and percentage bounds is a few vectorized comparisons across the whole
+catalog instead of per-drink dict lookups.
+
+Usage:
+    python3 feature_columns.py [--catalog data/drinks.json] [--output data/feature_columns.npz]
+    python3 feature_columns.py --all flag_1 flag_3 --none flag_5 --min calm_pct=20
+"""
+
+import argparse
+import json
+import time
+
+# First TSV column of each group
+PERCENT_START = 14
+FLAG_START = 21
+
+# The spreadsheet export does not label the last two percentage columns or
+# the flag columns, so they are named by position
+PERCENT_COLUMNS = ("dark_pct", "thirsty_pct", "calm_pct", "celebrate_pct", "fancy_pct",
+                   "percent_6", "percent_7")
+FLAG_COLUMNS = ("flag_1", "flag_2", "flag_3", "flag_4", "flag_5", "flag_6")
+
+# Stored in the uint8 percentage array for a missing or unparseable value
+MISSING_PERCENT = 255
+
+# NumPy is imported inside FeatureColumns only: every ingest script calls
+# parse_features(), and none of them should pay for loading NumPy
+
+
+def _parse_percent(text):
+    text = text.strip().rstrip("%")
+    if not text:
+        return None
+    try:
+        return max(0, min(100, int(round(float(text)))))
+    except ValueError:
+        return None
+
+
+def parse_features(parts, percent_start=PERCENT_START, flag_start=FLAG_START):
+    """Return the ``features`` dict for a split batch row; short rows give missing values"""
+    percents = [_parse_percent(parts[i]) if i < len(parts) else None
+                for i in range(percent_start, percent_start + len(PERCENT_COLUMNS))]
+    flags = 0
+    for bit in range(len(FLAG_COLUMNS)):
+        i = flag_start + bit
+        if i < len(parts) and parts[i].strip().lower() == "x":
+            flags |= 1 << bit
+    return {"percents": percents, "flags": flags}
+
+
+def flag_mask(names):
+    """Bitmask for a list of flag column names"""
+    mask = 0
+    for name in names:
+        try:
+            mask |= 1 << FLAG_COLUMNS.index(name)
+        except ValueError:
+            raise ValueError(f"unknown flag column {name!r} (expected one of {', '.join(FLAG_COLUMNS)})")
+    return mask
+
+
+def percent_column(name):
+    try:
+        return PERCENT_COLUMNS.index(name)
+    except ValueError:
+        raise ValueError(f"unknown percentage column {name!r} (expected one of {', '.join(PERCENT_COLUMNS)})")
+
+
+class FeatureColumns:
+    """Catalog features as arrays: ids (N,), percents uint8 (N, 7), flags uint8 (N,)
+
+    Drinks ingested before features were parsed have every percentage missing
+    and no flags set.
+    """
+
+    def __init__(self, ids, percents, flags):
+        self.ids = ids
+        self.percents = percents
+        self.flags = flags
+
+    @classmethod
+    def from_drinks(cls, drinks):
+        import numpy as np
+        ids = np.array([drink.get("id", -1) for drink in drinks], dtype=np.int64)
+        percents = np.full((len(drinks), len(PERCENT_COLUMNS)), MISSING_PERCENT, dtype=np.uint8)
+        flags = np.zeros(len(drinks), dtype=np.uint8)
+        for row, drink in enumerate(drinks):
+            features = drink.get("features")
+            if not features:
+                continue
+            percents[row] = [MISSING_PERCENT if value is None else value for value in features["percents"]]
+            flags[row] = features["flags"]
+        return cls(ids, percents, flags)
+
+    def save(self, path):
+        import numpy as np
+        np.savez(path, ids=self.ids, percents=self.percents, flags=self.flags)
+
+    @classmethod
+    def load(cls, path):
+        import numpy as np
+        with np.load(path) as data:
+            return cls(data["ids"], data["percents"], data["flags"])
+
+    def __len__(self):
+        return len(self.ids)
+
+    def select(self, all_flags=(), any_flags=(), no_flags=(), min_percent=None, max_percent=None):
+        """Boolean row mask of drinks matching every condition
+
+        ``all_flags``/``any_flags``/``no_flags`` are flag column names;
+        ``min_percent``/``max_percent`` map percentage column names to
+        inclusive bounds, and drinks missing that percentage never match.
+        """
+        import numpy as np
+
+        selected = np.ones(len(self.ids), dtype=bool)
+        required = flag_mask(all_flags)
+        if required:
+            selected &= (self.flags & required) == required
+        wanted = flag_mask(any_flags)
+        if wanted:
+            selected &= (self.flags & wanted) != 0
+        excluded = flag_mask(no_flags)
+        if excluded:
+            selected &= (self.flags & excluded) == 0
+        for name, bound in (min_percent or {}).items():
+            column = self.percents[:, percent_column(name)]
+            selected &= (column >= bound) & (column != MISSING_PERCENT)
+        for name, bound in (max_percent or {}).items():
+            column = self.percents[:, percent_column(name)]
+            selected &= column <= bound
+        return selected
+
+    def filter_ids(self, **conditions):
+        """Ids of drinks matching ``select(**conditions)``, in catalog order"""
+        return self.ids[self.select(**conditions)]
+
+
+def _bounds(items):
+    bounds = {}
+    for item in items:
+        name, value = item.split("=", 1)
+        bounds[name] = int(value)
+    return bounds
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Build and query the bit-packed feature columns")
+    parser.add_argument("--catalog", default="data/drinks.json")
+    parser.add_argument("--output", default="data/feature_columns.npz")
+    parser.add_argument("--all", nargs="+", default=[], metavar="FLAG", help="drinks with every flag")
+    parser.add_argument("--any", nargs="+", default=[], metavar="FLAG", help="drinks with at least one flag")
+    parser.add_argument("--none", nargs="+", default=[], metavar="FLAG", help="drinks with none of the flags")
+    parser.add_argument("--min", action="append", default=[], metavar="COLUMN=PERCENT")
+    parser.add_argument("--max", action="append", default=[], metavar="COLUMN=PERCENT")
+    args = parser.parse_args(argv)
+
+    with open(args.catalog, "r", encoding="utf-8") as f:
+        drinks = json.load(f)
+    columns = FeatureColumns.from_drinks(drinks)
+
+    if not (args.all or args.any or args.none or args.min or args.max):
+        columns.save(args.output)
+        with_features = sum(1 for drink in drinks if drink.get("features"))
+        print(f"Packed features for {with_features} of {len(drinks)} drinks")
+        print(f"Saved to: {args.output}")
+        return
+
+    start = time.perf_counter()
+    ids = columns.filter_ids(all_flags=args.all, any_flags=args.any, no_flags=args.none,
+                             min_percent=_bounds(args.min), max_percent=_bounds(args.max))
+    elapsed = time.perf_counter() - start
+    print(f"{len(ids)} of {len(columns)} drinks match ({elapsed * 1000:.2f} ms)")
+    print(ids[:50].tolist())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,220 @@
+#!/usr/bin/env python3
+"""
+Per-stage instrumentation for the drink ingest scripts.
+
+Each script wraps its read, split/parse, classify, dedupe and serialize steps in
+``metrics.stage(...)`` blocks. Wall time, CPU time, row and error counts are
+collected per stage together with peak RSS (the process high-water mark when
+the stage ends, so the first stage to reach it is the one that grew memory)
+and, with tracemalloc on, the peak Python heap inside the stage. The result is
+written as a JSON report so ingest performance can be compared across releases.
+
+Reports and profiles are opt-in through environment variables:
+
+    THINKDRINK_METRICS=report.json   write the JSON metrics report
+    THINKDRINK_PROFILE=ingest.prof   run the ingest under cProfile
+    THINKDRINK_TRACEMALLOC=1         also track peak Python heap via tracemalloc
+"""
+
+import json
+import os
+import platform
+import sys
+import time
+from contextlib import contextmanager
+from datetime import datetime, timezone
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+REPORT_VERSION = 1
+MAX_ERROR_SAMPLES = 20
+
+
+def peak_rss_bytes():
+    """Return the peak resident set size of this process in bytes (or None)"""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes, macOS reports bytes
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
+class StageMetrics:
+    """Accumulated timings and counters for one named stage"""
+
+    def __init__(self, name):
+        self.name = name
+        self.wall_seconds = 0.0
+        self.cpu_seconds = 0.0
+        self.calls = 0
+        self.rows = 0
+        self.errors = 0
+        self.skipped = 0
+        self.error_samples = []
+        self.peak_rss_bytes = None
+        self.peak_heap_bytes = None
+
+    def add_rows(self, count=1):
+        self.rows += count
+
+    def add_error(self, message=None):
+        self.errors += 1
+        if message is not None and len(self.error_samples) < MAX_ERROR_SAMPLES:
+            self.error_samples.append(str(message))
+
+    def add_skipped(self, count=1):
+        self.skipped += count
+
+    def to_dict(self):
+        rows_per_sec = self.rows / self.wall_seconds if self.wall_seconds > 0 else None
+        return {
+            "name": self.name,
+            "calls": self.calls,
+            "wall_seconds": round(self.wall_seconds, 6),
+            "cpu_seconds": round(self.cpu_seconds, 6),
+            "rows": self.rows,
+            "rows_per_sec": round(rows_per_sec, 1) if rows_per_sec is not None else None,
+            "skipped": self.skipped,
+            "errors": self.errors,
+            "error_samples": self.error_samples,
+            "peak_rss_bytes": self.peak_rss_bytes,
+            "peak_traced_heap_bytes": self.peak_heap_bytes,
+        }
+
+
+class IngestMetrics:
+    """Collects stage metrics for one ingest run and writes the JSON report"""
+
+    def __init__(self, job, report_path=None, profile_path=None, trace_memory=None):
+        self.job = job
+        self.report_path = report_path if report_path is not None else os.environ.get("THINKDRINK_METRICS")
+        self.profile_path = profile_path if profile_path is not None else os.environ.get("THINKDRINK_PROFILE")
+        if trace_memory is None:
+            trace_memory = os.environ.get("THINKDRINK_TRACEMALLOC", "") not in ("", "0")
+        self.trace_memory = trace_memory
+        self.stages = {}
+        self.started_at = None
+        self._wall_start = None
+        self._cpu_start = None
+        self._profiler = None
+        self._wall_total = 0.0
+        self._cpu_total = 0.0
+        self._peak_heap = None
+        # Heap peaks of the stages currently open, innermost last
+        self._open_heap_peaks = []
+
+    def start(self):
+        self.started_at = datetime.now(timezone.utc).isoformat()
+        if self.trace_memory:
+            import tracemalloc
+            tracemalloc.start()
+        if self.profile_path:
+            import cProfile
+            self._profiler = cProfile.Profile()
+            self._profiler.enable()
+        self._wall_start = time.perf_counter()
+        self._cpu_start = time.process_time()
+        return self
+
+    def stop(self):
+        self._wall_total = time.perf_counter() - self._wall_start
+        self._cpu_total = time.process_time() - self._cpu_start
+        if self._profiler is not None:
+            self._profiler.disable()
+            self._profiler.dump_stats(self.profile_path)
+            self._profiler = None
+        if self.trace_memory:
+            import tracemalloc
+            self._fold_heap_peak()
+            tracemalloc.stop()
+        if self.report_path:
+            self.write_report(self.report_path)
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc, tb):
+        self.stop()
+        return False
+
+    def get_stage(self, name):
+        if name not in self.stages:
+            self.stages[name] = StageMetrics(name)
+        return self.stages[name]
+
+    def _fold_heap_peak(self):
+        """Credit the traced heap peak since the last reset to the job and open stages, then reset it"""
+        import tracemalloc
+
+        current, peak = tracemalloc.get_traced_memory()
+        self._peak_heap = max(self._peak_heap or 0, peak)
+        self._open_heap_peaks[:] = [max(open_peak, peak) for open_peak in self._open_heap_peaks]
+        tracemalloc.reset_peak()
+        return current
+
+    @contextmanager
+    def stage(self, name, rows=0):
+        """Time a block and add it to the named stage; repeated blocks accumulate"""
+        stage = self.get_stage(name)
+        tracing = self.trace_memory and self._wall_start is not None
+        if tracing:
+            current = self._fold_heap_peak()
+            self._open_heap_peaks.append(current)
+        wall_start = time.perf_counter()
+        cpu_start = time.process_time()
+        try:
+            yield stage
+        finally:
+            stage.wall_seconds += time.perf_counter() - wall_start
+            stage.cpu_seconds += time.process_time() - cpu_start
+            stage.calls += 1
+            stage.rows += rows
+            stage.peak_rss_bytes = peak_rss_bytes()
+            if tracing:
+                self._fold_heap_peak()
+                heap_peak = self._open_heap_peaks.pop()
+                stage.peak_heap_bytes = max(stage.peak_heap_bytes or 0, heap_peak)
+
+    def error(self, stage_name, message=None):
+        """Count an error against a stage instead of printing one line per row"""
+        self.get_stage(stage_name).add_error(message)
+
+    @property
+    def total_errors(self):
+        return sum(stage.errors for stage in self.stages.values())
+
+    def to_dict(self):
+        return {
+            "report_version": REPORT_VERSION,
+            "job": self.job,
+            "started_at": self.started_at,
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "wall_seconds": round(self._wall_total, 6),
+            "cpu_seconds": round(self._cpu_total, 6),
+            "peak_rss_bytes": peak_rss_bytes(),
+            "peak_traced_heap_bytes": self._peak_heap,
+            "profile_path": self.profile_path,
+            "stages": [stage.to_dict() for stage in self.stages.values()],
+        }
+
+    def write_report(self, path):
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(self.to_dict(), f, indent=2)
+
+    def summary(self):
+        """Return a short human-readable summary line per stage"""
+        lines = []
+        for stage in self.stages.values():
+            line = f"  {stage.name:<10} {stage.wall_seconds * 1000:8.1f} ms  {stage.rows:>7} rows"
+            if stage.skipped:
+                line += f"  {stage.skipped} skipped"
+            if stage.errors:
+                line += f"  {stage.errors} errors"
+            if stage.peak_rss_bytes is not None:
+                line += f"  peak RSS {stage.peak_rss_bytes / 2**20:.0f} MiB"
+            lines.append(line)
+        return "\n".join(lines)
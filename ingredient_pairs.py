@@ -0,0 +1,131 @@
+#!/usr/bin/env python3
+"""
+Build "pairs well with" suggestions from ingredient co-occurrence.
+
+Every drink's canonical ingredients form a sparse drink x ingredient incidence
+matrix A. The ingredient x ingredient co-occurrence matrix is the sparse
+product A.T @ A, and each co-occurring pair is scored by pointwise mutual
+information:
+
+    pmi(i, j) = log(count(i, j) * drinks / (count(i) * count(j)))
+
+Only non-zero pairs are ever stored, so this scales to tens of thousands of
+ingredients. The top-N partners per ingredient are written as a compact JSON
+artifact (data/ingredient_pairs.json).
+
+Usage:
+    python3 ingredient_pairs.py [--catalog data/drinks.json] [--output data/ingredient_pairs.json] [--top 10]
+"""
+
+import argparse
+import json
+import time
+
+import numpy as np
+from scipy import sparse
+
+from ingredients import drink_ingredients
+
+ARTIFACT_VERSION = 1
+
+
+def build_incidence(drinks):
+    """Return (ingredient names, CSR drink x ingredient 0/1 matrix)"""
+    vocabulary = {}
+    rows = []
+    cols = []
+    for row, drink in enumerate(drinks):
+        for name in drink_ingredients(drink):
+            col = vocabulary.setdefault(name, len(vocabulary))
+            rows.append(row)
+            cols.append(col)
+    data = np.ones(len(rows), dtype=np.int32)
+    incidence = sparse.csr_matrix(
+        (data, (np.array(rows, dtype=np.int64), np.array(cols, dtype=np.int64))),
+        shape=(len(drinks), len(vocabulary)),
+    )
+    names = [None] * len(vocabulary)
+    for name, col in vocabulary.items():
+        names[col] = name
+    return names, incidence
+
+
+def cooccurrence(incidence):
+    """Return (per-ingredient drink counts, CSR co-occurrence counts without the diagonal)"""
+    counts = np.asarray(incidence.sum(axis=0)).ravel()
+    pairs = (incidence.T @ incidence).tocsr()
+    pairs.setdiag(0)
+    pairs.eliminate_zeros()
+    pairs.sort_indices()
+    return counts, pairs
+
+
+def pmi_scores(counts, pairs, total_drinks):
+    """Return a CSR matrix with the same sparsity as ``pairs`` holding PMI values"""
+    row_ids = np.repeat(np.arange(pairs.shape[0]), np.diff(pairs.indptr))
+    col_ids = pairs.indices
+    values = np.log(pairs.data * float(total_drinks) / (counts[row_ids] * counts[col_ids].astype(np.float64)))
+    return sparse.csr_matrix((values, col_ids.copy(), pairs.indptr.copy()), shape=pairs.shape)
+
+
+def top_pairs(pairs, pmi, top_n=10, min_count=2):
+    """Return the top ``top_n`` [partner, pmi, count] lists per ingredient, best first
+
+    Pairs seen in fewer than ``min_count`` drinks are dropped because PMI
+    over-rewards rare coincidences.
+    """
+    results = []
+    for i in range(pairs.shape[0]):
+        start, end = pairs.indptr[i], pairs.indptr[i + 1]
+        partners = pairs.indices[start:end]
+        together = pairs.data[start:end]
+        scores = pmi.data[start:end]
+        keep = together >= min_count
+        partners, together, scores = partners[keep], together[keep], scores[keep]
+        # Ties on PMI go to the pair seen in more drinks, at the cut-off too
+        order = np.lexsort((-together, -scores))[:top_n]
+        results.append([[int(partners[k]), round(float(scores[k]), 3), int(together[k])] for k in order])
+    return results
+
+
+def build_pairs_artifact(drinks, top_n=10, min_count=2):
+    names, incidence = build_incidence(drinks)
+    counts, pairs = cooccurrence(incidence)
+    pmi = pmi_scores(counts, pairs, len(drinks))
+    return {
+        "version": ARTIFACT_VERSION,
+        "drinks": len(drinks),
+        "min_count": min_count,
+        "ingredients": names,
+        "counts": counts.astype(int).tolist(),
+        # pairs[i] = [[partner index, pmi, drinks containing both], ...]
+        "pairs": top_pairs(pairs, pmi, top_n, min_count),
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Build ingredient pairing suggestions")
+    parser.add_argument("--catalog", default="data/drinks.json")
+    parser.add_argument("--output", default="data/ingredient_pairs.json")
+    parser.add_argument("--top", type=int, default=10, help="partners kept per ingredient")
+    parser.add_argument("--min-count", type=int, default=2, help="minimum drinks a pair must share")
+    args = parser.parse_args(argv)
+
+    with open(args.catalog, "r", encoding="utf-8") as f:
+        drinks = json.load(f)
+
+    start = time.perf_counter()
+    artifact = build_pairs_artifact(drinks, args.top, args.min_count)
+    elapsed = time.perf_counter() - start
+
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(artifact, f, separators=(",", ":"), ensure_ascii=False)
+
+    paired = sum(1 for partners in artifact["pairs"] if partners)
+    print(f"Built pairings for {paired} of {len(artifact['ingredients'])} ingredients "
+          f"from {len(drinks)} drinks in {elapsed * 1000:.1f} ms")
+    print(f"Saved to: {args.output}")
+
+
+if __name__ == "__main__":
+    main()
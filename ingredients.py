@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+"""
+Canonical ingredient names for drinks.
+
+Recipe lines such as "1 1/2 oz Bacardi(R) silver rum" or "1 ozfresh lime juice"
+are reduced to a canonical name ("bacardi silver rum", "fresh lime juice") so
+ingredients can be matched across drinks and batches.
+"""
+
+import re
+
+# Leading quantities: "1", "1/2", "1 1/2", "1.5-2", "1 - 2", "5-7"
+_QUANTITY = r"(?:\d+(?:[./]\d+)?(?:\s+\d+/\d+)?(?:\s*-\s*\d+(?:[./]\d+)?)?)"
+# Quantities that are unmistakably amounts without a unit: "1/2", "1 1/2",
+# "1.5", "5-7". A bare integer is only an amount before a unit, so product
+# names such as "7-Up" or "99 Bananas" keep their number.
+_FRACTIONAL = r"(?:\d+\s+\d+/\d+|\d+[./]\d+(?:\s*-\s*\d+(?:[./]\d+)?)?|\d+\s*-\s*\d+(?:[./]\d+)?)"
+
+_UNITS = (
+    "oz", "ounces?", "parts?", "cl", "ml", "l", "tsp", "teaspoons?", "tbsp", "tblsp", "tablespoons?",
+    "cups?", "shots?", "jiggers?", "dash(?:es)?", "splash(?:es)?", "drops?", "pinch(?:es)?",
+    "scoops?", "squeezes?", "slices?", "twists?", "wedges?", "sprigs?", "leaves", "cubes?",
+    "bottles?", "cans?", "glass(?:es)?", "fill", "top",
+)
+
+_MEASURE = re.compile(
+    r"^(?:(?:juice\s+of|top\s+(?:up\s+)?with|fill\s+with)\s+)?"
+    r"(?:"
+    r"(?:" + _QUANTITY + r"\s*)?"
+    r"(?:(?:small|medium|large|generous|a)\s+)?"
+    # Some exports glue the unit to the next word ("1 ozfresh lime juice", "3 ozcold cola")
+    r"(?:" + "|".join(_UNITS) + r")(?:\([^)]*\))?(?:\s+of)?(?:\b|(?=fresh)|(?:(?<=\doz)|(?<=\d oz))(?=[a-z]))\.?\s*"
+    r"|" + _FRACTIONAL + r"\s+"
+    r")?",
+    re.IGNORECASE,
+)
+
+_TRADEMARK = re.compile(r"\((?:r|tm)\)", re.IGNORECASE)
+_PARENTHETICAL = re.compile(r"\([^)]*\)")
+_NON_WORD = re.compile(r"[^a-z0-9&' -]+")
+_SPACES = re.compile(r"\s+")
+
+
+def canonical_ingredient(text, measured=True):
+    """Return the canonical name for one ingredient line, or '' if nothing is left
+
+    With ``measured`` false, ``text`` is already a plain name (a shopping list
+    entry) and no leading quantity or unit is stripped.
+    """
+    name = _TRADEMARK.sub("", text.strip())
+    if measured:
+        name = _MEASURE.sub("", name, count=1)
+    name = _PARENTHETICAL.sub(" ", name).lower()
+    name = _NON_WORD.sub(" ", name)
+    name = _SPACES.sub(" ", name).strip(" -'")
+    return name
+
+
+def drink_ingredients(drink):
+    """Return the distinct canonical ingredient names of a drink, in recipe order
+
+    The shopping list (plain names) is used when the record has one; otherwise
+    the measured ingredient lines are canonicalized.
+    """
+    source = drink.get("shopping_list")
+    measured = not source
+    if measured:
+        source = drink.get("ingredients") or []
+    if isinstance(source, str):
+        source = source.split("|")
+    names = []
+    seen = set()
+    for item in source:
+        name = canonical_ingredient(item, measured)
+        if name and name not in seen:
+            seen.add(name)
+            names.append(name)
+    return names
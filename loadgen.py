@@ -0,0 +1,289 @@
+#!/usr/bin/env python3
+"""
+Load generator and query-replay harness for recommendation and search.
+
+Query streams imitate real use of the app:
+
+    slider     a user dragging one mood slider step by step; every step is a
+               recommendation query, like the slider 'input' event
+    search     typing a drink or ingredient name one character at a time,
+               sometimes with a typo
+    random     bursts of the Random button: several random mood vectors
+               back to back
+
+Queries are JSON objects ({"type": "recommend", "moods": {...}} or
+{"type": "search", "query": "marg"}) and can be recorded to and replayed
+from a JSON-lines log. They run against the Python scoring/search path
+(recommend.py, autocomplete_index.py) or a local HTTP endpoint, with asyncio
+driving each concurrency level in turn. The report gives throughput and
+p50/p95/p99 latency per level and per query type.
+
+Usage:
+    python3 loadgen.py --queries 5000 --concurrency 1 2 4 8 --report load_report.json
+    python3 loadgen.py --record queries.jsonl --queries 10000
+    python3 loadgen.py --replay queries.jsonl --http http://localhost:8080
+"""
+
+import argparse
+import asyncio
+import json
+import math
+import random
+import time
+import urllib.parse
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+
+from recommend import MOODS, TOP_K, MoodMatrix, score_all, top_k
+
+DEFAULT_MIX = {"slider": 0.6, "search": 0.3, "random": 0.1}
+# Failed queries whose exception is kept in the report, per level
+ERROR_SAMPLES = 5
+
+
+# --- Query generation ---
+
+def slider_trajectory(rng, moods):
+    """Drag one slider from its current value to a new one, one step per query"""
+    mood = rng.choice(MOODS)
+    target = rng.randint(1, 10)
+    step = 1 if target > moods[mood] else -1
+    queries = []
+    while moods[mood] != target:
+        moods[mood] += step
+        queries.append({"type": "recommend", "moods": dict(moods)})
+    return queries
+
+
+def _typo(rng, text):
+    if len(text) < 4:
+        return text
+    i = rng.randrange(1, len(text) - 1)
+    kind = rng.choice(("drop", "swap", "replace"))
+    if kind == "drop":
+        return text[:i] + text[i + 1:]
+    if kind == "swap":
+        return text[:i] + text[i + 1] + text[i] + text[i + 2:]
+    return text[:i] + rng.choice("aeiourstln") + text[i + 1:]
+
+
+def search_prefixes(rng, names, typo_rate=0.2):
+    """Type a name one character at a time, as the search box sees it"""
+    name = rng.choice(names).lower()
+    if rng.random() < typo_rate:
+        name = _typo(rng, name)
+    length = rng.randint(min(3, len(name)), len(name))
+    return [{"type": "search", "query": name[:i]} for i in range(1, length + 1)]
+
+
+def random_burst(rng, max_presses=5):
+    """Several presses of the Random button"""
+    return [{"type": "recommend", "moods": {mood: rng.randint(1, 10) for mood in MOODS}}
+            for _ in range(rng.randint(1, max_presses))]
+
+
+def generate_queries(count, names, mix=None, seed=0):
+    """Return ``count`` queries drawn from slider, search and random-button sessions"""
+    rng = random.Random(seed)
+    mix = mix or DEFAULT_MIX
+    kinds = list(mix)
+    weights = [mix[kind] for kind in kinds]
+    moods = {mood: 5 for mood in MOODS}
+    queries = []
+    while len(queries) < count:
+        kind = rng.choices(kinds, weights)[0]
+        if kind == "slider":
+            queries.extend(slider_trajectory(rng, moods))
+        elif kind == "search" and names:
+            queries.extend(search_prefixes(rng, names))
+        else:
+            queries.extend(random_burst(rng))
+    return queries[:count]
+
+
+def read_query_log(path):
+    with open(path, "r", encoding="utf-8") as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def write_query_log(path, queries):
+    with open(path, "w", encoding="utf-8") as f:
+        for query in queries:
+            f.write(json.dumps(query))
+            f.write("\n")
+
+
+# --- Targets ---
+
+class LocalTarget:
+    """Runs queries against the Python recommendation and autocomplete code"""
+
+    def __init__(self, drinks, autocomplete):
+        self.drinks = drinks
+        self.matrix = MoodMatrix.from_drinks(drinks)
+        self.autocomplete = autocomplete
+
+    def run(self, query):
+        if query["type"] == "recommend":
+            return top_k(score_all(self.matrix, query["moods"]), TOP_K)
+        return self.autocomplete.suggest(query["query"])
+
+
+class HttpTarget:
+    """Sends queries to a local HTTP endpoint
+
+    Recommendations are GET {base}/recommend?energetic=7&...; searches are
+    GET {base}/search?q=...
+    """
+
+    def __init__(self, base_url, timeout=10):
+        self.base_url = base_url.rstrip("/")
+        self.timeout = timeout
+
+    def run(self, query):
+        if query["type"] == "recommend":
+            url = f"{self.base_url}/recommend?{urllib.parse.urlencode(query['moods'])}"
+        else:
+            url = f"{self.base_url}/search?{urllib.parse.urlencode({'q': query['query']})}"
+        with urllib.request.urlopen(url, timeout=self.timeout) as response:
+            return response.read()
+
+
+# --- Running and reporting ---
+
+def percentile(sorted_values, fraction):
+    """Nearest-rank percentile of an already sorted list"""
+    if not sorted_values:
+        return None
+    rank = max(1, math.ceil(fraction * len(sorted_values)))
+    return sorted_values[rank - 1]
+
+
+def latency_summary(latencies):
+    ordered = sorted(latencies)
+    return {
+        "count": len(ordered),
+        "p50_ms": round(percentile(ordered, 0.50) * 1000, 3) if ordered else None,
+        "p95_ms": round(percentile(ordered, 0.95) * 1000, 3) if ordered else None,
+        "p99_ms": round(percentile(ordered, 0.99) * 1000, 3) if ordered else None,
+        "max_ms": round(ordered[-1] * 1000, 3) if ordered else None,
+    }
+
+
+async def run_level(target, queries, concurrency):
+    """Run all queries with ``concurrency`` workers; return the level report
+
+    Each level gets its own thread pool with one thread per worker: the
+    default executor is capped at min(32, cpu + 4) threads, which would
+    quietly limit the higher levels.
+    """
+    queue = asyncio.Queue()
+    for query in queries:
+        queue.put_nowait(query)
+    latencies = {}
+    errors = 0
+    error_samples = []
+    loop = asyncio.get_running_loop()
+
+    async def worker(executor):
+        nonlocal errors
+        while True:
+            try:
+                query = queue.get_nowait()
+            except asyncio.QueueEmpty:
+                return
+            start = time.perf_counter()
+            try:
+                await loop.run_in_executor(executor, target.run, query)
+            except Exception as e:
+                errors += 1
+                if len(error_samples) < ERROR_SAMPLES:
+                    error_samples.append({"query": query, "error": f"{type(e).__name__}: {e}"})
+                continue
+            latencies.setdefault(query["type"], []).append(time.perf_counter() - start)
+
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        start = time.perf_counter()
+        await asyncio.gather(*(worker(executor) for _ in range(concurrency)))
+        elapsed = time.perf_counter() - start
+
+    completed = sum(len(values) for values in latencies.values())
+    return {
+        "concurrency": concurrency,
+        "seconds": round(elapsed, 4),
+        "throughput_qps": round(completed / elapsed, 1) if elapsed > 0 else None,
+        "errors": errors,
+        "error_samples": error_samples,
+        "all": latency_summary([value for values in latencies.values() for value in values]),
+        "by_type": {kind: latency_summary(values) for kind, values in latencies.items()},
+    }
+
+
+def run_load(target, queries, levels):
+    return [asyncio.run(run_level(target, queries, level)) for level in levels]
+
+
+def _catalog_names(drinks, autocomplete):
+    return [term[0] for term in autocomplete.terms] or [drink["name"] for drink in drinks]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Load-test recommendation and search")
+    parser.add_argument("--catalog", default="data/drinks.json")
+    parser.add_argument("--autocomplete", default="data/autocomplete.json",
+                        help="autocomplete artifact (built in memory if missing)")
+    parser.add_argument("--queries", type=int, default=2000, help="number of generated queries")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 2, 4, 8])
+    parser.add_argument("--record", help="write the generated queries to a JSON-lines log and exit")
+    parser.add_argument("--replay", help="replay queries from a JSON-lines log instead of generating")
+    parser.add_argument("--http", help="base URL of a local HTTP endpoint to test instead of the Python path")
+    parser.add_argument("--report", help="write the JSON report here")
+    args = parser.parse_args(argv)
+
+    from autocomplete_index import Autocomplete, build_autocomplete
+
+    with open(args.catalog, "r", encoding="utf-8") as f:
+        drinks = json.load(f)
+    try:
+        autocomplete = Autocomplete.load(args.autocomplete)
+    except FileNotFoundError:
+        autocomplete = Autocomplete(build_autocomplete(drinks))
+
+    if args.replay:
+        queries = read_query_log(args.replay)
+    else:
+        queries = generate_queries(args.queries, _catalog_names(drinks, autocomplete), seed=args.seed)
+
+    if args.record:
+        write_query_log(args.record, queries)
+        print(f"Recorded {len(queries)} queries to {args.record}")
+        return
+
+    target = HttpTarget(args.http) if args.http else LocalTarget(drinks, autocomplete)
+    levels = run_load(target, queries, args.concurrency)
+
+    print(f"{len(queries)} queries against {len(drinks)} drinks ({'HTTP ' + args.http if args.http else 'local'})")
+    print(f"{'conc':>5} {'qps':>10} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'errors':>7}")
+    for level in levels:
+        summary = level["all"]
+        print(f"{level['concurrency']:>5} {level['throughput_qps'] or 0:>10.1f} {summary['p50_ms'] or 0:>9.3f} "
+              f"{summary['p95_ms'] or 0:>9.3f} {summary['p99_ms'] or 0:>9.3f} {level['errors']:>7}")
+    for level in levels:
+        for sample in level["error_samples"]:
+            print(f"  concurrency {level['concurrency']}: {sample['query']['type']} failed with {sample['error']}")
+
+    if args.report:
+        report = {
+            "catalog_size": len(drinks),
+            "queries": len(queries),
+            "target": args.http or "local",
+            "levels": levels,
+        }
+        with open(args.report, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+        print(f"Saved to: {args.report}")
+
+
+if __name__ == "__main__":
+    main()
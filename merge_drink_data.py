@@ -4,69 +4,54 @@ Merge the extracted Excel data with existing drinks.json
 """
 
 import json
+import os
 import sys
 from pathlib import Path
 
-def merge_drink_data():
+from catalog_store import (DEFAULT_RETRIES, CatalogConflictError, append_new_drinks, catalog_version,
+                           commit_file, temp_path_for)
+from ingest_metrics import IngestMetrics
+from streaming_json import JsonArrayWriter, external_sort, iter_json_array
+
+DEFAULT_CATALOG_PATH = "data/drinks.json"
+DEFAULT_NEW_DATA_PATH = "data/drink_think_data.json"
+
+def merge_drink_data(existing_path=None, new_data_path=None):
     """Merge Excel data with existing drinks.json"""
     
-    # Load existing drinks
-    existing_path = "/Users/craigdalessio/thinkdrink-app/data/drinks.json"
-    new_data_path = "/Users/craigdalessio/thinkdrink-app/data/drink_think_data.json"
+    existing_path = existing_path or DEFAULT_CATALOG_PATH
+    new_data_path = new_data_path or DEFAULT_NEW_DATA_PATH
     
     try:
-        # Load existing drinks
-        with open(existing_path, 'r', encoding='utf-8') as f:
-            existing_drinks = json.load(f)
-        
-        print(f"Loaded {len(existing_drinks)} existing drinks")
-        
-        # Load new data
-        with open(new_data_path, 'r', encoding='utf-8') as f:
-            new_drinks = json.load(f)
-        
-        print(f"Loaded {len(new_drinks)} new drinks from Excel")
-        
-        # Create a mapping of existing drink names to avoid duplicates
-        existing_names = {drink['name'].lower() for drink in existing_drinks}
-        
-        # Filter new drinks to avoid duplicates
-        unique_new_drinks = []
-        duplicates = 0
-        
-        for drink in new_drinks:
-            if drink['name'].lower() not in existing_names:
-                # Convert to the existing format
-                converted_drink = {
-                    "id": int(drink['id']),
-                    "name": drink['name'],
-                    "spirit": extract_spirit(drink['ingredients']),
-                    "difficulty": determine_difficulty(drink['ingredients']),
-                    "description": drink['instructions'][:200] + "..." if len(drink['instructions']) > 200 else drink['instructions'],
-                    "ingredients": drink['ingredients'],
-                    "flavor": determine_flavor(drink['ingredients']),
-                    "instructions": drink['instructions'],
-                    "glass": drink['glass'],
-                    "garnish": extract_garnish(drink['instructions']),
-                    "moods": convert_mood_scores(drink['mood_scores']),
-                    "fancy": drink['mood_scores'].get('fancy', 5.0)
-                }
-                unique_new_drinks.append(converted_drink)
-            else:
-                duplicates += 1
-        
-        print(f"Found {duplicates} duplicate drinks")
-        print(f"Adding {len(unique_new_drinks)} unique new drinks")
-        
-        # Merge the data
-        merged_drinks = existing_drinks + unique_new_drinks
-        
-        # Save merged data
-        with open(existing_path, 'w', encoding='utf-8') as f:
-            json.dump(merged_drinks, f, indent=2, ensure_ascii=False)
+        with IngestMetrics("merge_drink_data") as metrics:
+            # Load new data; the existing catalog is read by update_catalog
+            with metrics.stage("read") as stage:
+                with open(new_data_path, 'r', encoding='utf-8') as f:
+                    new_drinks = json.load(f)
+                stage.add_rows(len(new_drinks))
+            
+            print(f"Loaded {len(new_drinks)} new drinks from Excel")
+            
+            # Convert to the existing format before the catalog is read
+            with metrics.stage("classify") as stage:
+                converted = []
+                for drink in new_drinks:
+                    try:
+                        converted.append(convert_drink(drink))
+                    except (KeyError, TypeError, ValueError) as e:
+                        metrics.error("classify", f"{drink.get('name')}: {e}")
+                stage.add_rows(len(new_drinks))
+            
+            # Add drinks whose name is not in the catalog yet and save it atomically
+            added, merged_drinks = append_new_drinks(existing_path, converted, key=name_key,
+                                                     metrics=metrics, ensure_ascii=False)
+            print(f"Loaded {len(merged_drinks) - len(added)} existing drinks")
+            print(f"Found {len(converted) - len(added)} duplicate drinks")
+            print(f"Added {len(added)} unique new drinks")
         
         print(f"Successfully merged data! Total drinks: {len(merged_drinks)}")
         print(f"Saved to: {existing_path}")
+        print(metrics.summary())
         
         return merged_drinks
         
@@ -76,6 +61,120 @@ def merge_drink_data():
         traceback.print_exc()
         return None
 
+def name_key(drink):
+    """Deduplication key for a drink record"""
+    return drink['name'].lower()
+
+def merge_drink_data_streaming(existing_path=None, new_data_path=None, output_path=None, run_size=50000,
+                               retries=DEFAULT_RETRIES):
+    """Merge Excel data with existing drinks.json with bounded memory
+    
+    Existing drinks are copied through to the output unchanged while their name
+    keys are spilled to a sorted run. New drinks are externally sorted by name
+    key and merge-joined against those keys, so neither catalog is ever held in
+    memory. New drinks are appended in name order, and duplicates within the new
+    data are dropped as well. If another writer replaces the output while a pass
+    streams, the commit fails with CatalogConflictError and the whole pass runs
+    again against the new catalog, up to ``retries`` times.
+    """
+    existing_path = existing_path or DEFAULT_CATALOG_PATH
+    new_data_path = new_data_path or DEFAULT_NEW_DATA_PATH
+    output_path = output_path or existing_path
+    
+    try:
+        for attempt in range(retries + 1):
+            try:
+                metrics, added, total = _merge_streaming_pass(existing_path, new_data_path, output_path, run_size)
+                break
+            except CatalogConflictError:
+                if attempt == retries:
+                    raise
+                print(f"{output_path} was updated by another writer, retrying ({attempt + 1}/{retries})")
+    except Exception as e:
+        print(f"Error merging data: {e}")
+        import traceback
+        traceback.print_exc()
+        return None
+    
+    print(f"Found {metrics.get_stage('dedupe').skipped} duplicate drinks")
+    print(f"Added {added} unique new drinks. Total drinks: {total}")
+    print(f"Saved to: {output_path}")
+    print(metrics.summary())
+    return total
+
+def _merge_streaming_pass(existing_path, new_data_path, output_path, run_size):
+    """One streaming merge into ``output_path``; return (metrics, added, total)"""
+    tmpdir = os.path.dirname(os.path.abspath(output_path))
+    # Commit only if no other writer replaced the output while we streamed
+    expected_version = catalog_version(output_path)
+    tmp_output = temp_path_for(output_path)
+    
+    try:
+        with IngestMetrics("merge_drink_data_streaming") as metrics, JsonArrayWriter(tmp_output) as writer:
+            # Copy existing drinks through, keeping only their name keys
+            with metrics.stage("read") as stage:
+                existing_keys = external_sort(
+                    (name_key(drink) for drink in _copy_through(iter_json_array(existing_path), writer)),
+                    key=None, run_size=run_size, tmpdir=tmpdir)
+                stage.add_rows(writer.count)
+            print(f"Streamed {writer.count} existing drinks")
+            
+            with metrics.stage("sort"):
+                new_sorted = external_sort(iter_json_array(new_data_path), key=name_key,
+                                           run_size=run_size, tmpdir=tmpdir)
+            
+            # Merge-join sorted new drinks against sorted existing keys
+            with metrics.stage("dedupe") as stage:
+                existing_key = next(existing_keys, None)
+                last_key = None
+                added = 0
+                for drink in new_sorted:
+                    stage.add_rows()
+                    key = name_key(drink)
+                    while existing_key is not None and existing_key < key:
+                        existing_key = next(existing_keys, None)
+                    if key == existing_key or key == last_key:
+                        stage.add_skipped()
+                        continue
+                    last_key = key
+                    try:
+                        writer.write(convert_drink(drink))
+                        added += 1
+                    except (KeyError, TypeError, ValueError) as e:
+                        metrics.error("dedupe", f"{drink.get('name')}: {e}")
+        
+        commit_file(tmp_output, output_path, expected_version)
+    except BaseException:
+        if os.path.exists(tmp_output):
+            os.remove(tmp_output)
+        raise
+    return metrics, added, writer.count
+
+def _copy_through(drinks, writer):
+    for drink in drinks:
+        writer.write(drink)
+        yield drink
+
+def convert_drink(drink):
+    """Convert an extracted Excel drink to the app format"""
+    return {
+        "id": int(drink['id']),
+        "name": drink['name'],
+        "spirit": extract_spirit(drink['ingredients']),
+        "difficulty": determine_difficulty(drink['ingredients']),
+        "description": drink['instructions'][:200] + "..." if len(drink['instructions']) > 200 else drink['instructions'],
+        "ingredients": drink['ingredients'],
+        "shopping_list": drink.get('shopping_list') or [],
+        "flavor": determine_flavor(drink['ingredients']),
+        "instructions": drink['instructions'],
+        "glass": drink['glass'],
+        "garnish": extract_garnish(drink['instructions']),
+        "moods": convert_mood_scores(drink['mood_scores']),
+        "fancy": drink['mood_scores'].get('fancy', 5.0),
+        "source_scores": extract_source_scores(drink['mood_scores']),
+        "image": drink.get('image')
+    }
+
 def extract_spirit(ingredients):
     """Extract the main spirit from ingredients"""
     spirits = ['vodka', 'gin', 'rum', 'whiskey', 'tequila', 'bourbon', 'scotch', 'brandy', 'cognac']
@@ -126,6 +225,17 @@ def extract_garnish(instructions):
                 return garnish_part[:50] + "..." if len(garnish_part) > 50 else garnish_part
     return "None"
 
+def extract_source_scores(mood_scores):
+    """Keep the raw Excel mood columns so moods can be regenerated by mood_mapping.py"""
+    source_scores = {}
+    for column in ['dark', 'thirsty', 'calm', 'celebrate', 'fancy']:
+        value = mood_scores.get(column)
+        if value is None and column == 'celebrate':
+            value = mood_scores.get('celebration')
+        if value is not None:
+            source_scores[column] = float(value)
+    return source_scores
+
 def convert_mood_scores(mood_scores):
     """Convert Excel mood scores to app format"""
     # Map the Excel mood scores to our app's mood system
@@ -153,4 +263,7 @@ def convert_mood_scores(mood_scores):
     return moods
 
 if __name__ == "__main__":
-    merge_drink_data()
+    if "--streaming" in sys.argv[1:]:
+        merge_drink_data_streaming()
+    else:
+        merge_drink_data()
@@ -0,0 +1,154 @@
+#!/usr/bin/env python3
+"""
+Regenerate every drink's app moods from its raw source scores.
+
+Ingest scripts keep the spreadsheet columns (dark, thirsty, calm, celebrate,
+fancy) in each drink's ``source_scores``. The mapping to the app's six moods is
+a linear transform plus clamp:
+
+    moods = clip(W @ source_scores + bias, low, high)
+
+W and bias come from a JSON config (data/mood_mapping.json) and the transform
+is applied to the whole catalog in one NumPy pass, so the mood model can be
+retuned without re-running any ingest. Set "round": true in the config to
+round moods half up to whole numbers.
+
+Usage:
+    python3 mood_mapping.py [--catalog data/drinks.json] [--mapping data/mood_mapping.json] [--dry-run]
+"""
+
+import argparse
+import json
+import os
+import time
+from operator import itemgetter
+
+import numpy as np
+
+from catalog_store import read_catalog, update_catalog
+
+SOURCE_COLUMNS = ("dark", "thirsty", "calm", "celebrate", "fancy")
+MOODS = ("energetic", "relaxed", "romantic", "adventurous", "celebratory", "cozy")
+
+# Source value used when a drink is missing one of the columns
+DEFAULT_SOURCE_VALUE = 5.0
+
+# Matches the inference in parse_latest_batch.py, the only ingest that fills
+# all six moods, which keeps half steps such as 7.5
+DEFAULT_MAPPING = {
+    "weights": {
+        "energetic": {"thirsty": 1.0},
+        "relaxed": {"calm": 1.0},
+        "romantic": {"dark": 0.5, "calm": 0.5},
+        "adventurous": {"thirsty": 0.5, "celebrate": 0.5},
+        "celebratory": {"celebrate": 1.0},
+        "cozy": {"dark": 1.0},
+    },
+    "bias": {},
+    "clamp": [1, 10],
+    "round": False,
+}
+
+
+class MoodMapping:
+    """Linear-plus-clamp mapping from source columns to app moods"""
+
+    def __init__(self, weights, bias, low, high, round_values=False):
+        self.weights = weights
+        self.bias = bias
+        self.low = low
+        self.high = high
+        self.round_values = round_values
+
+    @classmethod
+    def from_config(cls, config):
+        weights = np.zeros((len(MOODS), len(SOURCE_COLUMNS)), dtype=np.float64)
+        bias = np.zeros(len(MOODS), dtype=np.float64)
+        for mood, row in config.get("weights", {}).items():
+            if mood not in MOODS:
+                raise ValueError(f"Unknown mood in mapping: {mood}")
+            for column, weight in row.items():
+                if column not in SOURCE_COLUMNS:
+                    raise ValueError(f"Unknown source column in mapping: {column}")
+                weights[MOODS.index(mood), SOURCE_COLUMNS.index(column)] = weight
+        for mood, value in config.get("bias", {}).items():
+            if mood not in MOODS:
+                raise ValueError(f"Unknown mood in mapping: {mood}")
+            bias[MOODS.index(mood)] = value
+        low, high = config.get("clamp", [1, 10])
+        return cls(weights, bias, low, high, config.get("round", False))
+
+    @classmethod
+    def load(cls, path):
+        with open(path, "r", encoding="utf-8") as f:
+            return cls.from_config(json.load(f))
+
+    def apply(self, sources):
+        """Map an (N, 5) source matrix to an (N, 6) mood matrix"""
+        moods = sources @ self.weights.T + self.bias
+        np.clip(moods, self.low, self.high, out=moods)
+        if self.round_values:
+            # Half up (6.5 -> 7), not NumPy's half to even
+            np.floor(moods + 0.5, out=moods)
+        return moods
+
+
+def source_matrix(drinks):
+    """Return (indices, matrix) for drinks that carry source_scores"""
+    indices = [i for i, drink in enumerate(drinks) if drink.get("source_scores")]
+    getter = itemgetter(*SOURCE_COLUMNS)
+    rows = []
+    for i in indices:
+        scores = drinks[i]["source_scores"]
+        try:
+            rows.append(getter(scores))
+        except KeyError:
+            rows.append(tuple(scores.get(column, DEFAULT_SOURCE_VALUE) for column in SOURCE_COLUMNS))
+    matrix = np.array(rows, dtype=np.float64).reshape(len(indices), len(SOURCE_COLUMNS))
+    return indices, matrix
+
+
+def remap_catalog(drinks, mapping):
+    """Recompute ``moods`` in place for every drink with source scores; return the count"""
+    indices, sources = source_matrix(drinks)
+    moods = mapping.apply(sources)
+    values = moods.astype(np.int64).tolist() if mapping.round_values else moods.tolist()
+    for i, row in zip(indices, values):
+        drinks[i]["moods"] = dict(zip(MOODS, row))
+    return len(indices)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Regenerate drink moods from raw source scores")
+    parser.add_argument("--catalog", default="data/drinks.json")
+    parser.add_argument("--mapping", default="data/mood_mapping.json",
+                        help="mapping config (the built-in mapping is used if the file does not exist)")
+    parser.add_argument("--dry-run", action="store_true", help="compute moods without writing the catalog")
+    args = parser.parse_args()
+
+    if os.path.exists(args.mapping):
+        mapping = MoodMapping.load(args.mapping)
+    else:
+        mapping = MoodMapping.from_config(DEFAULT_MAPPING)
+
+    def remap(drinks):
+        start = time.perf_counter()
+        remapped = remap_catalog(drinks, mapping)
+        return remapped, len(drinks), time.perf_counter() - start
+
+    if args.dry_run:
+        drinks, _ = read_catalog(args.catalog)
+        remapped, total, elapsed = remap(drinks)
+    else:
+        # Re-applied to the re-read catalog if another writer commits first
+        remapped, total, elapsed = update_catalog(args.catalog, remap, ensure_ascii=False)
+
+    print(f"Remapped moods for {remapped} of {total} drinks in {elapsed * 1000:.1f} ms")
+    skipped = total - remapped
+    if skipped:
+        print(f"{skipped} drinks have no source_scores and were left unchanged")
+    if not args.dry_run:
+        print(f"Saved to: {args.catalog}")
+
+if __name__ == "__main__":
+    main()
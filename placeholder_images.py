@@ -0,0 +1,151 @@
+#!/usr/bin/env python3
+"""
+Build-time placeholder images for drink cards.
+
+Every drink gets a small SVG (a gradient for its spirit with the drink's
+initials) written to data/images/ under the hash of its content, and the
+catalog's ``image`` field points at that local file instead of a remote
+placeholder service. Drinks that render identically share one file, files
+already on disk are not rewritten, and the content-hashed names never change
+for the same image, so they can be cached forever.
+
+The stage also writes data/images/precache.json, the list of image URLs that
+sw.js adds to its cache on install, so cards render offline with no extra
+network round trips.
+
+Usage:
+    python3 placeholder_images.py [--catalog data/drinks.json] [--output-dir data/images] [--prune]
+"""
+
+import argparse
+import hashlib
+import json
+import os
+from html import escape
+
+from catalog_store import update_catalog
+
+IMAGE_SIZE = 160
+PRECACHE_MANIFEST = "precache.json"
+
+# Gradient (start, end) per spirit; anything else uses the default
+SPIRIT_COLORS = {
+    "Vodka": ("#4ecdc4", "#1a535c"),
+    "Gin": ("#a8e6cf", "#3d8361"),
+    "Rum": ("#f7b267", "#a44a3f"),
+    "Whiskey": ("#d4a373", "#6b3e26"),
+    "Tequila": ("#f9dc5c", "#c36f09"),
+    "Brandy": ("#c08497", "#5e2b3d"),
+    "Liqueur": ("#cdb4db", "#6a4c93"),
+}
+DEFAULT_COLORS = ("#ff6b6b", "#4ecdc4")
+
+_SVG_TEMPLATE = (
+    '<svg xmlns="http://www.w3.org/2000/svg" width="{size}" height="{size}" viewBox="0 0 {size} {size}">'
+    '<defs><linearGradient id="g" x1="0" y1="0" x2="1" y2="1">'
+    '<stop offset="0" stop-color="{start}"/><stop offset="1" stop-color="{end}"/>'
+    '</linearGradient></defs>'
+    '<rect width="{size}" height="{size}" fill="url(#g)"/>'
+    '<text x="50%" y="50%" dy=".35em" text-anchor="middle" fill="#fff" '
+    'font-family="Helvetica,Arial,sans-serif" font-size="{font_size}" font-weight="700">{text}</text>'
+    '</svg>\n'
+)
+
+
+def initials(name, limit=2):
+    """Up to ``limit`` capital initials from the words of a drink name"""
+    letters = [word[0] for word in name.split() if word[:1].isalnum()]
+    return "".join(letters[:limit]).upper() or "?"
+
+
+def render_placeholder(drink):
+    """SVG source of a drink's placeholder image"""
+    start, end = SPIRIT_COLORS.get(drink.get("spirit"), DEFAULT_COLORS)
+    text = escape(initials(drink.get("name", "")), quote=False)
+    return _SVG_TEMPLATE.format(size=IMAGE_SIZE, start=start, end=end, font_size=IMAGE_SIZE * 3 // 8, text=text)
+
+
+def content_hash(data):
+    return hashlib.sha256(data.encode("utf-8")).hexdigest()[:16]
+
+
+def build_placeholders(drinks, output_dir="data/images", url_prefix=None):
+    """Write one SVG per distinct placeholder and set each drink's ``image``
+
+    Returns the sorted list of image URLs. ``url_prefix`` defaults to
+    ``output_dir`` with a trailing slash.
+    """
+    if url_prefix is None:
+        url_prefix = output_dir.rstrip("/") + "/"
+    os.makedirs(output_dir, exist_ok=True)
+    urls = set()
+    written = set()
+    for drink in drinks:
+        svg = render_placeholder(drink)
+        filename = f"{content_hash(svg)}.svg"
+        if filename not in written:
+            path = os.path.join(output_dir, filename)
+            if not os.path.exists(path):
+                with open(path, "w", encoding="utf-8") as f:
+                    f.write(svg)
+            written.add(filename)
+        drink["image"] = url_prefix + filename
+        urls.add(drink["image"])
+    return sorted(urls)
+
+
+def read_precache_manifest(output_dir):
+    """URLs in the existing precache manifest, or [] if there is none"""
+    try:
+        with open(os.path.join(output_dir, PRECACHE_MANIFEST), "r", encoding="utf-8") as f:
+            return json.load(f)["urls"]
+    except FileNotFoundError:
+        return []
+
+
+def write_precache_manifest(output_dir, urls, keep_existing=False):
+    """Write the image list sw.js precaches; return its path
+
+    With ``keep_existing``, URLs already in the manifest stay in it, for
+    stages that only see some of the catalog's drinks.
+    """
+    path = os.path.join(output_dir, PRECACHE_MANIFEST)
+    urls = {"/" + url.lstrip("/") for url in urls}
+    if keep_existing:
+        urls.update(read_precache_manifest(output_dir))
+    urls = sorted(urls)
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump({"version": content_hash("\n".join(urls)), "urls": urls}, f, indent=2)
+    return path
+
+
+def prune_images(output_dir, urls):
+    """Delete SVGs in ``output_dir`` that no drink references; return how many"""
+    keep = {os.path.basename(url) for url in urls}
+    removed = 0
+    for filename in os.listdir(output_dir):
+        if filename.endswith(".svg") and filename not in keep:
+            os.remove(os.path.join(output_dir, filename))
+            removed += 1
+    return removed
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Generate local placeholder images for every drink")
+    parser.add_argument("--catalog", default="data/drinks.json")
+    parser.add_argument("--output-dir", default="data/images")
+    parser.add_argument("--prune", action="store_true", help="delete images no drink references any more")
+    args = parser.parse_args(argv)
+
+    urls = update_catalog(args.catalog, lambda drinks: build_placeholders(drinks, args.output_dir))
+    manifest_path = write_precache_manifest(args.output_dir, urls)
+
+    print(f"{len(urls)} placeholder images in {args.output_dir}")
+    if args.prune:
+        print(f"Removed {prune_images(args.output_dir, urls)} unused images")
+    print(f"Saved to: {args.catalog}")
+    print(f"Precache manifest: {manifest_path}")
+
+
+if __name__ == "__main__":
+    main()
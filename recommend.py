@@ -0,0 +1,208 @@
+#!/usr/bin/env python3
+"""
+Python port of the mood recommender in script.js (generateRecommendations).
+
+score_drink() is a line-by-line translation of the weighted score for one
+drink. MoodMatrix/score_all() compute the same score for the whole catalog
+with NumPy, and check_parity() verifies the two agree. Batch jobs and
+benchmarks use the vectorized path. rerank_diverse() replaces the plain top-K
+with a maximal-marginal-relevance pick over precomputed drink similarity.
+
+The weighted score has four parts, as in script.js:
+    40%  dominant mood: the user's strongest mood, if it is >= 7
+    30%  profile similarity over moods the user wants (>= 6) or avoids (<= 4)
+    20%  intensity: average user mood vs. the drink's mood total / 6
+    10%  combination bonus: share of moods where user and drink agree
+"""
+
+import random
+
+import numpy as np
+
+# Slider order in index.html; ties for the dominant mood go to the earlier one
+MOODS = ("energetic", "relaxed", "romantic", "adventurous", "celebratory", "cozy")
+DEFAULT_MOOD_VALUE = 5
+TOP_K = 6
+# Diversity reranking: candidates considered, and weight of redundancy vs. score
+CANDIDATE_POOL = 30
+DIVERSITY = 0.3
+
+
+def score_drink(drink_moods, user_moods):
+    """Weighted score of one drink, exactly as script.js computes weightedScore"""
+    average_mood = sum(user_moods[mood] for mood in MOODS) / 6
+    # Stable sort by value descending, like Array.prototype.sort in script.js
+    dominant_mood, dominant_value = sorted(((mood, user_moods[mood]) for mood in MOODS),
+                                           key=lambda item: -item[1])[0]
+    total_score = 0.0
+
+    if dominant_value >= 7:
+        drink_value = drink_moods.get(dominant_mood) or DEFAULT_MOOD_VALUE
+        total_score += drink_value * (dominant_value / 10) * 0.4
+
+    profile_similarity = 0.0
+    mood_count = 0
+    for mood in MOODS:
+        user_value = user_moods[mood]
+        drink_value = drink_moods.get(mood) or DEFAULT_MOOD_VALUE
+        if user_value >= 6:
+            profile_similarity += max(0, 10 - abs(user_value - drink_value))
+            mood_count += 1
+        elif user_value <= 4:
+            profile_similarity += max(0, 10 - abs((10 - user_value) - drink_value))
+            mood_count += 1
+    if mood_count > 0:
+        total_score += (profile_similarity / mood_count) * 0.3
+
+    # script.js sums every value in drink.moods, not just the six sliders
+    drink_intensity = sum(drink_moods.values()) / 6
+    intensity_match = max(0, 10 - abs(average_mood - drink_intensity))
+    total_score += intensity_match * 0.2
+
+    matching_moods = 0
+    for mood in MOODS:
+        user_value = user_moods[mood]
+        drink_value = drink_moods.get(mood) or DEFAULT_MOOD_VALUE
+        if (user_value >= 6 and drink_value >= 6) or (user_value <= 4 and drink_value <= 4):
+            matching_moods += 1
+    total_score += (matching_moods / 6) * 10 * 0.1
+
+    return total_score
+
+
+class MoodMatrix:
+    """Catalog moods as arrays: values (N, 6) and intensity (N,)
+
+    Drinks without moods get a random score in script.js; they are marked in
+    ``has_moods`` and never recommended here.
+    """
+
+    def __init__(self, values, intensity, has_moods):
+        self.values = values
+        self.intensity = intensity
+        self.has_moods = has_moods
+
+    @classmethod
+    def from_drinks(cls, drinks):
+        values = np.full((len(drinks), len(MOODS)), DEFAULT_MOOD_VALUE, dtype=np.float64)
+        intensity = np.zeros(len(drinks), dtype=np.float64)
+        has_moods = np.zeros(len(drinks), dtype=bool)
+        for row, drink in enumerate(drinks):
+            moods = drink.get("moods")
+            if not moods:
+                continue
+            has_moods[row] = True
+            values[row] = [moods.get(mood) or DEFAULT_MOOD_VALUE for mood in MOODS]
+            intensity[row] = sum(moods.values()) / 6
+        return cls(values, intensity, has_moods)
+
+    def packed(self):
+        """One (N, 8) float64 array: six moods, intensity, has_moods flag"""
+        return np.column_stack([self.values, self.intensity, self.has_moods.astype(np.float64)])
+
+    @classmethod
+    def from_packed(cls, packed):
+        return cls(packed[:, :6], packed[:, 6], packed[:, 7] > 0)
+
+
+def score_all(matrix, user_moods):
+    """Weighted scores for every drink in a MoodMatrix (NaN for drinks without moods)"""
+    user = np.array([user_moods[mood] for mood in MOODS], dtype=np.float64)
+    values = matrix.values
+    average_mood = user.sum() / 6
+    dominant = int(np.argmax(user))  # first maximum, matching the stable sort
+
+    scores = np.zeros(len(values), dtype=np.float64)
+    if user[dominant] >= 7:
+        scores += values[:, dominant] * (user[dominant] / 10) * 0.4
+
+    wants = user >= 6
+    avoids = user <= 4
+    considered = wants | avoids
+    if considered.any():
+        target = np.where(wants, user, 10 - user)
+        similarity = np.maximum(0, 10 - np.abs(target[considered] - values[:, considered]))
+        scores += similarity.sum(axis=1) / considered.sum() * 0.3
+
+    scores += np.maximum(0, 10 - np.abs(average_mood - matrix.intensity)) * 0.2
+
+    matching = ((wants & (values >= 6)) | (avoids & (values <= 4))).sum(axis=1)
+    scores += matching / 6 * 10 * 0.1
+
+    scores[~matrix.has_moods] = np.nan
+    return scores
+
+
+def top_k(scores, k=TOP_K, exclude=()):
+    """Indices of the ``k`` best positive scores, best first; ties keep catalog order"""
+    scores = scores.copy()
+    if len(exclude):
+        scores[np.asarray(exclude, dtype=np.int64)] = np.nan
+    candidates = np.flatnonzero(scores > 0)
+    if len(candidates) > k:
+        # Keep everything tied with the k-th score so catalog order can break ties
+        kth = np.partition(scores[candidates], len(candidates) - k)[len(candidates) - k]
+        candidates = candidates[scores[candidates] >= kth]
+    order = np.lexsort((candidates, -scores[candidates]))
+    return candidates[order][:k]
+
+
+def rerank_diverse(scores, similarity, k=TOP_K, pool=CANDIDATE_POOL, diversity=DIVERSITY, exclude=()):
+    """Indices of ``k`` drinks chosen by maximal marginal relevance, best first
+
+    Candidates are the ``pool`` best scores. Each step picks the candidate
+    with the highest
+
+        (1 - diversity) * score / best score - diversity * max similarity to earlier picks
+
+    where ``similarity.get(row, other)`` is a precomputed lookup
+    (drink_similarity.DrinkSimilarity), so a rerank costs k x pool lookups.
+    Ties go to the higher-scored candidate.
+    """
+    candidates = top_k(scores, pool, exclude)
+    if len(candidates) == 0:
+        return candidates
+    relevance = scores[candidates] / scores[candidates[0]]
+    redundancy = np.zeros(len(candidates), dtype=np.float64)
+    available = np.ones(len(candidates), dtype=bool)
+    picks = []
+    for _ in range(min(k, len(candidates))):
+        marginal = (1 - diversity) * relevance - diversity * redundancy
+        marginal[~available] = -np.inf
+        best = int(np.argmax(marginal))
+        picks.append(best)
+        available[best] = False
+        for i in np.flatnonzero(available):
+            redundancy[i] = max(redundancy[i], similarity.get(candidates[best], candidates[i]))
+    return candidates[picks]
+
+
+def recommend(drinks, user_moods, k=TOP_K, matrix=None, similarity=None):
+    """Top ``k`` drinks for a mood vector, as script.js would show them
+
+    With ``similarity`` (a DrinkSimilarity for this catalog), the top
+    candidates are reranked for diversity.
+    """
+    matrix = matrix or MoodMatrix.from_drinks(drinks)
+    scores = score_all(matrix, user_moods)
+    if similarity is not None:
+        return [drinks[i] for i in rerank_diverse(scores, similarity, k)]
+    return [drinks[i] for i in top_k(scores, k)]
+
+
+def check_parity(drinks, samples=200, seed=0, tolerance=1e-9):
+    """Compare score_all against score_drink on random slider settings; return the max difference"""
+    rng = random.Random(seed)
+    matrix = MoodMatrix.from_drinks(drinks)
+    worst = 0.0
+    for _ in range(samples):
+        user = {mood: rng.randint(1, 10) for mood in MOODS}
+        vectorized = score_all(matrix, user)
+        for row, drink in enumerate(drinks):
+            if not drink.get("moods"):
+                continue
+            difference = abs(vectorized[row] - score_drink(drink["moods"], user))
+            worst = max(worst, difference)
+    if worst > tolerance:
+        raise AssertionError(f"vectorized scores differ from script.js port by {worst}")
+    return worst
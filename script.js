@@ -5,6 +5,10 @@ class ThinkDrinkApp {
         this.bars = [];
         this.filteredDrinks = [];
         this.recommendedDrinks = [];
+        // drink id -> Map(neighbor id -> similarity), from drink_similarity.py
+        this.similarity = null;
+        // Facet value -> sorted drink ids, from facet_index.py
+        this.facetIndex = null;
         this.favorites = JSON.parse(localStorage.getItem('thinkdrink_favorites') || '[]');
         this.recent = JSON.parse(localStorage.getItem('thinkdrink_recent') || '[]');
         this.currentMood = null;
@@ -23,6 +27,8 @@ class ThinkDrinkApp {
     async init() {
         await this.loadDrinks();
         await this.loadBars();
+        await this.loadSimilarity();
+        await this.loadFacetIndex();
         this.setupEventListeners();
         this.generateRecommendations();
         this.renderRecommended();
@@ -61,6 +67,115 @@ class ThinkDrinkApp {
         }
     }
     
+    async loadSimilarity() {
+        // Precomputed sparse drink similarity for diversity reranking.
+        // Without it, recommendations are the plain top 6.
+        try {
+            const response = await fetch('data/drink_similarity.json');
+            if (!response.ok) return;
+            const artifact = await response.json();
+            this.similarity = new Map();
+            artifact.neighbors.forEach((flat, row) => {
+                const neighbors = new Map();
+                for (let i = 0; i < flat.length; i += 2) {
+                    neighbors.set(artifact.ids[flat[i]], flat[i + 1]);
+                }
+                this.similarity.set(artifact.ids[row], neighbors);
+            });
+        } catch (error) {
+            console.warn('Drink similarity unavailable, using plain top picks:', error);
+        }
+    }
+    
+    async loadFacetIndex() {
+        // Precomputed facet id lists and counts; filters fall back to scanning
+        // the catalog when the index is missing or built from another catalog.
+        try {
+            const response = await fetch('data/facet_index.json');
+            if (!response.ok) return;
+            const artifact = await response.json();
+            if (artifact.size !== this.drinks.length ||
+                artifact.fingerprint !== this.catalogFingerprint(this.drinks)) return;
+            this.facetIndex = artifact;
+            // Case-insensitive value lookup and catalog position of every id
+            this.facetValues = {};
+            Object.entries(artifact.facets).forEach(([facet, values]) => {
+                this.facetValues[facet] = new Map(
+                    Object.keys(values).map(value => [value.toLowerCase(), value])
+                );
+            });
+            this.drinkRows = new Map(this.drinks.map((drink, row) => [drink.id, row]));
+        } catch (error) {
+            console.warn('Facet index unavailable, filtering by catalog scan:', error);
+        }
+    }
+    
+    catalogFingerprint(drinks) {
+        // 32-bit FNV-1a of the comma-joined ids, as facet_index.catalog_fingerprint
+        const text = drinks.map(drink => String(drink.id)).join(',');
+        let hash = 0x811c9dc5;
+        for (let i = 0; i < text.length; i++) {
+            hash = Math.imul(hash ^ text.charCodeAt(i), 0x01000193) >>> 0;
+        }
+        return hash;
+    }
+    
+    intersectSorted(a, b) {
+        if (a.length > b.length) [a, b] = [b, a];
+        const result = [];
+        let lo = 0;
+        for (const value of a) {
+            // Binary search in b from the previous match on
+            let hi = b.length;
+            while (lo < hi) {
+                const mid = (lo + hi) >> 1;
+                if (b[mid] < value) lo = mid + 1; else hi = mid;
+            }
+            if (lo === b.length) break;
+            if (b[lo] === value) {
+                result.push(value);
+                lo++;
+            }
+        }
+        return result;
+    }
+    
+    facetSelection(filters) {
+        // Sorted ids matching every facet filter, or null when nothing is filtered
+        const lists = Object.entries(filters)
+            .filter(([, value]) => value && value !== 'all')
+            .map(([facet, value]) => {
+                const display = this.facetValues[facet].get(value.toLowerCase());
+                return display ? this.facetIndex.facets[facet][display] : [];
+            })
+            .sort((a, b) => a.length - b.length);
+        if (lists.length === 0) return null;
+        return lists.slice(1).reduce((result, ids) => this.intersectSorted(result, ids), lists[0]);
+    }
+    
+    facetCounts(facet) {
+        // Count of each value of a facet within the selection on the other facets
+        const others = { spirit: this.currentFilters.spirit, difficulty: this.currentFilters.difficulty };
+        delete others[facet];
+        const selection = this.facetSelection(others);
+        const counts = {};
+        Object.entries(this.facetIndex.facets[facet]).forEach(([value, ids]) => {
+            counts[value] = selection ? this.intersectSorted(selection, ids).length : this.facetIndex.counts[facet][value];
+        });
+        return counts;
+    }
+    
+    updateFacetCounts() {
+        if (!this.facetIndex) return;
+        ['spirit', 'difficulty'].forEach(facet => {
+            const counts = this.facetCounts(facet);
+            document.querySelectorAll(`.filter-link[data-${facet}] .filter-count`).forEach(span => {
+                const value = span.parentElement.dataset[facet];
+                span.textContent = counts[value] || 0;
+            });
+        });
+    }
+    
     getSampleDrinks() {
         return [
             {
@@ -233,7 +348,7 @@ class ThinkDrinkApp {
         console.log('Top 3 moods:', sortedMoods);
         
         // Calculate sophisticated matching scores for each drink
-        this.recommendedDrinks = this.drinks
+        const rankedDrinks = this.drinks
             .map(drink => {
                 if (!drink.moods) {
                     // If drink has no mood data, give it a random low score
@@ -331,8 +446,9 @@ class ThinkDrinkApp {
                 };
             })
             .filter(drink => drink.weightedScore > 0) // Only drinks with some match
-            .sort((a, b) => b.weightedScore - a.weightedScore)
-            .slice(0, 6);
+            .sort((a, b) => b.weightedScore - a.weightedScore);
+        
+        this.recommendedDrinks = this.rerankDiverse(rankedDrinks, 6);
             
         console.log('Top recommended drinks:', this.recommendedDrinks.map(d => ({
             name: d.name,
@@ -342,6 +458,45 @@ class ThinkDrinkApp {
         })));
     }
     
+    rerankDiverse(rankedDrinks, count, poolSize = 30, diversity = 0.3) {
+        // Maximal marginal relevance over the best candidates, as in
+        // recommend.rerank_diverse: each pick maximizes
+        // (1 - diversity) * relative score - diversity * similarity to earlier picks
+        if (!this.similarity || rankedDrinks.length === 0) {
+            return rankedDrinks.slice(0, count);
+        }
+        
+        const candidates = rankedDrinks.slice(0, poolSize);
+        const bestScore = candidates[0].weightedScore;
+        const redundancy = candidates.map(() => 0);
+        const available = candidates.map(() => true);
+        const picks = [];
+        
+        while (picks.length < Math.min(count, candidates.length)) {
+            let pick = -1;
+            let pickValue = -Infinity;
+            candidates.forEach((drink, i) => {
+                if (!available[i]) return;
+                const value = (1 - diversity) * (drink.weightedScore / bestScore) - diversity * redundancy[i];
+                if (value > pickValue) {
+                    pick = i;
+                    pickValue = value;
+                }
+            });
+            picks.push(pick);
+            available[pick] = false;
+            
+            const neighbors = this.similarity.get(candidates[pick].id) || new Map();
+            candidates.forEach((drink, i) => {
+                if (available[i]) {
+                    redundancy[i] = Math.max(redundancy[i], neighbors.get(drink.id) || 0);
+                }
+            });
+        }
+        
+        return picks.map(i => candidates[i]);
+    }
+    
     renderRecommended() {
         const grid = document.getElementById('recommendedGrid');
         const currentMoods = this.getCurrentMoodValues();
@@ -476,9 +631,10 @@ class ThinkDrinkApp {
         const spirits = [...new Set(this.drinks.map(drink => drink.spirit))].sort();
         const spiritContainer = document.getElementById('spiritFilters');
         
+        const countBadge = this.facetIndex ? ' <span class="filter-count"></span>' : '';
         spirits.forEach(spirit => {
             const li = document.createElement('li');
-            li.innerHTML = `<a href="#" class="filter-link" data-spirit="${spirit}">${spirit}</a>`;
+            li.innerHTML = `<a href="#" class="filter-link" data-spirit="${spirit}">${spirit}${countBadge}</a>`;
             spiritContainer.appendChild(li);
         });
         
@@ -488,7 +644,7 @@ class ThinkDrinkApp {
         
         difficulties.forEach(difficulty => {
             const li = document.createElement('li');
-            li.innerHTML = `<a href="#" class="filter-link" data-difficulty="${difficulty}">${difficulty}</a>`;
+            li.innerHTML = `<a href="#" class="filter-link" data-difficulty="${difficulty}">${difficulty}${countBadge}</a>`;
             difficultyContainer.appendChild(li);
         });
         
@@ -507,17 +663,35 @@ class ThinkDrinkApp {
                 this.filterAndRender();
             });
         });
+        this.updateFacetCounts();
     }
     
     filterAndRender() {
-        this.filteredDrinks = this.drinks.filter(drink => {
+        let candidates = this.drinks;
+        const useIndex = this.facetIndex !== null;
+        if (useIndex) {
+            // Spirit and difficulty filters via the facet index, in catalog order
+            const selection = this.facetSelection({
+                spirit: this.currentFilters.spirit,
+                difficulty: this.currentFilters.difficulty
+            });
+            if (selection) {
+                candidates = selection
+                    .map(id => this.drinkRows.get(id))
+                    .filter(row => row !== undefined)
+                    .sort((a, b) => a - b)
+                    .map(row => this.drinks[row]);
+            }
+        }
+        
+        this.filteredDrinks = candidates.filter(drink => {
             // Spirit filter
-            if (this.currentFilters.spirit !== 'all' && drink.spirit !== this.currentFilters.spirit) {
+            if (!useIndex && this.currentFilters.spirit !== 'all' && drink.spirit !== this.currentFilters.spirit) {
                 return false;
             }
             
             // Difficulty filter
-            if (this.currentFilters.difficulty !== 'all' && drink.difficulty !== this.currentFilters.difficulty) {
+            if (!useIndex && this.currentFilters.difficulty !== 'all' && drink.difficulty !== this.currentFilters.difficulty) {
                 return false;
             }
             
@@ -550,6 +724,7 @@ class ThinkDrinkApp {
         });
         
         this.renderDrinks();
+        this.updateFacetCounts();
         this.updateStats();
     }
     
@@ -6,6 +6,8 @@
 class SearchFunctionality {
     constructor() {
         this.searchIndex = [];
+        this.drinksById = new Map();
+        this.autocomplete = null;
         this.searchResults = [];
         this.currentQuery = '';
         this.selectedIndex = -1;
@@ -68,8 +70,12 @@ class SearchFunctionality {
                 searchText: this.createSearchText(drink)
             }));
             
+            this.searchIndex.forEach(drink => this.drinksById.set(String(drink.id), drink));
+            
             console.log(`Search index created with ${this.searchIndex.length} drinks`);
             
+            await this.loadAutocompleteIndex();
+            
             // Test search functionality
             this.testSearch();
         } catch (error) {
@@ -77,6 +83,25 @@ class SearchFunctionality {
         }
     }
     
+    async loadAutocompleteIndex() {
+        // Build-time prefix table + trigram index (autocomplete_index.py).
+        // Without it, search falls back to scanning the catalog.
+        try {
+            const response = await fetch('/data/autocomplete.json');
+            if (!response.ok) return;
+            const artifact = await response.json();
+            this.autocomplete = {
+                terms: artifact.terms,
+                keys: artifact.keys.map(([key]) => key),
+                keyTerms: artifact.keys.map(([, term]) => term),
+                trigrams: artifact.trigrams
+            };
+            console.log(`Autocomplete index loaded with ${this.autocomplete.keys.length} keys`);
+        } catch (error) {
+            console.warn('Autocomplete index unavailable, using full scan search:', error);
+        }
+    }
+    
     testSearch() {
         // Test if search is working
         console.log('Testing search functionality...');
@@ -170,25 +195,158 @@ class SearchFunctionality {
         this.displaySearchResults();
     }
     
-    performSearch(query) {
-        console.log('Performing search for:', query);
-        console.log('Search index length:', this.searchIndex.length);
+    performSearch(query, limit = 10) {
+        if (!this.autocomplete) {
+            this.searchResults = this.scanSearch(query, limit);
+            return;
+        }
         
+        // Name and ingredient hits from the index come first; when they do not
+        // fill the list (categories, glasses, flavors, several words), the
+        // field scan adds the drinks it would have found
+        const results = this.indexedSearch(query, limit);
+        if (results.length < limit) {
+            const seen = new Set(results.map(drink => drink.id));
+            for (const drink of this.scanSearch(query, limit)) {
+                if (results.length >= limit) break;
+                if (!seen.has(drink.id)) results.push(drink);
+            }
+        }
+        this.searchResults = results;
+    }
+    
+    scanSearch(query, limit) {
         const searchTerms = query.toLowerCase().split(' ').filter(term => term.length > 0);
         
-        this.searchResults = this.searchIndex
+        return this.searchIndex
             .map(drink => {
                 const score = this.calculateSearchScore(drink, searchTerms);
                 return { ...drink, score };
             })
             .filter(drink => drink.score > 0)
             .sort((a, b) => b.score - a.score)
-            .slice(0, 10); // Limit to top 10 results
+            .slice(0, limit);
+    }
+    
+    indexedSearch(query, limit) {
+        // Drinks named by the suggestions, then drinks containing suggested ingredients
+        const results = [];
+        const seen = new Set();
+        for (const suggestion of this.suggest(query, limit)) {
+            for (const id of suggestion.ids) {
+                const drink = this.drinksById.get(String(id));
+                if (!drink || seen.has(drink.id)) continue;
+                seen.add(drink.id);
+                results.push({ ...drink, score: 100 - suggestion.distance * 25, matchedTerm: suggestion.name });
+                if (results.length >= limit) return results;
+            }
+        }
+        return results;
+    }
+    
+    // --- Autocomplete index lookup (mirrors autocomplete_index.Autocomplete) ---
+    
+    normalizeQuery(text) {
+        return text.toLowerCase().replace(/[^a-z0-9]+/g, ' ').trim();
+    }
+    
+    queryTrigrams(word) {
+        const padded = '  ' + word;
+        const grams = new Set();
+        for (let i = 0; i + 3 <= padded.length; i++) {
+            grams.add(padded.slice(i, i + 3));
+        }
+        return grams;
+    }
+    
+    maxEditDistance(query) {
+        if (query.length <= 3) return 0;
+        if (query.length <= 6) return 1;
+        return 2;
+    }
+    
+    prefixDistance(query, key, limit) {
+        // Smallest edit distance between query and any prefix of key
+        let previous = Array.from({ length: key.length + 1 }, (_, j) => j);
+        for (let i = 1; i <= query.length; i++) {
+            const current = [i];
+            let rowMin = i;
+            for (let j = 1; j <= key.length; j++) {
+                const value = Math.min(
+                    previous[j - 1] + (query[i - 1] === key[j - 1] ? 0 : 1),
+                    previous[j] + 1,
+                    current[j - 1] + 1
+                );
+                current.push(value);
+                if (value < rowMin) rowMin = value;
+            }
+            if (rowMin > limit) return limit + 1;
+            previous = current;
+        }
+        return Math.min(...previous);
+    }
+    
+    suggest(rawQuery, limit = 10) {
+        const index = this.autocomplete;
+        const query = this.normalizeQuery(rawQuery);
+        if (!index || !query) return [];
+        
+        // Prefix matches: binary search for the first key >= query
+        const candidates = [];
+        let low = 0;
+        let high = index.keys.length;
+        while (low < high) {
+            const mid = (low + high) >> 1;
+            if (index.keys[mid] < query) low = mid + 1;
+            else high = mid;
+        }
+        for (let i = low; i < index.keys.length && index.keys[i].startsWith(query) && candidates.length < limit * 20; i++) {
+            candidates.push([0, i]);
+        }
+        
+        // Fuzzy matches: keys sharing enough trigrams, verified by edit distance
+        const distance = this.maxEditDistance(query);
+        if (distance && candidates.length < limit) {
+            const grams = this.queryTrigrams(query.split(' ')[0]);
+            const needed = Math.max(1, grams.size - 3 * distance);
+            const hits = new Map();
+            grams.forEach(gram => {
+                (index.trigrams[gram] || []).forEach(keyIndex => {
+                    hits.set(keyIndex, (hits.get(keyIndex) || 0) + 1);
+                });
+            });
+            hits.forEach((count, keyIndex) => {
+                if (count < needed) return;
+                const found = this.prefixDistance(query, index.keys[keyIndex], distance);
+                if (found <= distance) candidates.push([found, keyIndex]);
+            });
+        }
         
-        console.log('Search results found:', this.searchResults.length);
-        if (this.searchResults.length > 0) {
-            console.log('Top result:', this.searchResults[0]);
+        const best = new Map();
+        candidates.forEach(([found, keyIndex]) => {
+            const term = index.keyTerms[keyIndex];
+            const [name, kind, ids] = index.terms[term];
+            const key = index.keys[keyIndex];
+            const wholeName = key === this.normalizeQuery(name);
+            const exact = found === 0 && key === query;
+            const rank = [found, exact ? 0 : 1, wholeName ? 0 : 1, kind === 'drink' ? 0 : 1, -ids.length, name.length];
+            const current = best.get(term);
+            if (!current || this.compareRanks(rank, current.rank) < 0) {
+                best.set(term, { rank, name, kind, ids, distance: found });
+            }
+        });
+        
+        return [...best.values()]
+            .sort((a, b) => this.compareRanks(a.rank, b.rank))
+            .slice(0, limit)
+            .map(({ name, kind, ids, distance }) => ({ name, kind, ids, distance }));
+    }
+    
+    compareRanks(a, b) {
+        for (let i = 0; i < a.length; i++) {
+            if (a[i] !== b[i]) return a[i] - b[i];
         }
+        return 0;
     }
     
     calculateSearchScore(drink, searchTerms) {
@@ -0,0 +1,180 @@
+#!/usr/bin/env python3
+"""
+Incremental JSON array reading/writing and an external sort for catalogs that
+do not fit in memory.
+
+    iter_json_array(path)        yields the elements of a top-level JSON array
+    JsonArrayWriter(path)        writes elements one at a time
+    external_sort(items, key)    sorts an iterable using sorted runs spilled to
+                                 temporary JSON-lines files
+"""
+
+import heapq
+import itertools
+import json
+import os
+import tempfile
+
+READ_CHUNK_SIZE = 1 << 16
+DEFAULT_RUN_SIZE = 50000
+
+_WHITESPACE = " \t\n\r"
+
+
+def iter_json_array(path, chunk_size=READ_CHUNK_SIZE):
+    """Yield each element of the top-level JSON array in ``path`` without loading the whole file"""
+    decoder = json.JSONDecoder()
+    with open(path, "r", encoding="utf-8") as f:
+        buffer = ""
+        pos = 0
+        eof = False
+
+        def fill():
+            nonlocal buffer, pos, eof
+            chunk = f.read(chunk_size)
+            if not chunk:
+                eof = True
+            buffer = buffer[pos:] + chunk
+            pos = 0
+
+        def skip_whitespace():
+            nonlocal pos
+            while True:
+                while pos < len(buffer) and buffer[pos] in _WHITESPACE:
+                    pos += 1
+                if pos < len(buffer) or eof:
+                    return
+                fill()
+
+        skip_whitespace()
+        if pos >= len(buffer) or buffer[pos] != "[":
+            raise ValueError(f"{path}: expected a JSON array")
+        pos += 1
+
+        skip_whitespace()
+        if pos < len(buffer) and buffer[pos] == "]":
+            return
+
+        while True:
+            skip_whitespace()
+            while True:
+                try:
+                    item, end = decoder.raw_decode(buffer, pos)
+                except json.JSONDecodeError:
+                    # The element may continue in the next chunk
+                    if eof:
+                        raise
+                    fill()
+                    continue
+                # A number cut at the end of the buffer still decodes ("0" of
+                # "0.5"): accept an element only once the "," or "]" after it
+                # is in the buffer
+                after = end
+                while after < len(buffer) and buffer[after] not in ",]":
+                    after += 1
+                if after == len(buffer) and not eof:
+                    fill()
+                    continue
+                break
+            pos = end
+            yield item
+
+            skip_whitespace()
+            if pos >= len(buffer):
+                raise ValueError(f"{path}: unterminated JSON array")
+            if buffer[pos] == ",":
+                pos += 1
+            elif buffer[pos] == "]":
+                return
+            else:
+                raise ValueError(f"{path}: unexpected {buffer[pos]!r} between array elements")
+
+
+class JsonArrayWriter:
+    """Write a JSON array one element at a time
+
+    With ``indent`` set, the output matches ``json.dump(items, f, indent=indent)``.
+    """
+
+    def __init__(self, path, indent=2, ensure_ascii=False):
+        self.path = path
+        self.indent = indent
+        self.ensure_ascii = ensure_ascii
+        self.count = 0
+        self._file = None
+
+    def __enter__(self):
+        self._file = open(self.path, "w", encoding="utf-8")
+        self._file.write("[")
+        return self
+
+    def write(self, item):
+        text = json.dumps(item, indent=self.indent, ensure_ascii=self.ensure_ascii)
+        if self.indent is None:
+            self._file.write(", " if self.count else "")
+            self._file.write(text)
+        else:
+            pad = " " * self.indent
+            self._file.write(",\n" if self.count else "\n")
+            self._file.write(pad + text.replace("\n", "\n" + pad))
+        self.count += 1
+
+    def write_all(self, items):
+        for item in items:
+            self.write(item)
+
+    def close(self):
+        if self._file is None:
+            return
+        if self.count and self.indent is not None:
+            self._file.write("\n")
+        self._file.write("]")
+        self._file.close()
+        self._file = None
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+        return False
+
+
+def _spill_run(run, key, tmpdir):
+    run.sort(key=key)
+    fd, path = tempfile.mkstemp(prefix="thinkdrink-run-", suffix=".jsonl", dir=tmpdir)
+    with os.fdopen(fd, "w", encoding="utf-8") as f:
+        for item in run:
+            f.write(json.dumps(item, ensure_ascii=False))
+            f.write("\n")
+    return path
+
+
+def _read_run(path):
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            for line in f:
+                yield json.loads(line)
+    finally:
+        os.remove(path)
+
+
+def external_sort(items, key, run_size=DEFAULT_RUN_SIZE, tmpdir=None):
+    """Return an iterator over ``items`` sorted by ``key``
+
+    At most ``run_size`` items are held in memory at once: the input is cut into
+    sorted runs that are written to temporary files and k-way merged on read.
+    Items must be JSON-serializable. The input is consumed (and runs spilled)
+    before this function returns.
+    """
+    iterator = iter(items)
+    first_run = list(itertools.islice(iterator, run_size))
+    if len(first_run) < run_size:
+        first_run.sort(key=key)
+        return iter(first_run)
+
+    run_paths = [_spill_run(first_run, key, tmpdir)]
+    del first_run
+    while True:
+        run = list(itertools.islice(iterator, run_size))
+        if not run:
+            break
+        run_paths.append(_spill_run(run, key, tmpdir))
+    return heapq.merge(*(_read_run(path) for path in run_paths), key=key)
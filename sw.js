@@ -1,5 +1,7 @@
 // Service Worker for ThinkDrink PWA
-const CACHE_NAME = 'thinkdrink-v1';
+const CACHE_NAME = 'thinkdrink-v2';
+// Written by placeholder_images.py: content-hashed card images to precache
+const IMAGE_MANIFEST = '/data/images/precache.json';
 const urlsToCache = [
   '/',
   '/index.html',
@@ -17,13 +19,35 @@ self.addEventListener('install', event => {
     caches.open(CACHE_NAME)
       .then(cache => {
         console.log('Opened cache');
-        return cache.addAll(urlsToCache);
+        return cache.addAll(urlsToCache).then(() => precacheImages(cache));
       })
   );
 });
 
+// Add every placeholder image listed in the manifest; a missing manifest
+// only means images are fetched on first use instead. The manifest's
+// version is a hash of its URL list: the copy kept in the cache records
+// which list was precached, so a new build's images are picked up on the
+// next page load without bumping CACHE_NAME.
+function precacheImages(cache) {
+  return Promise.all([
+    fetch(IMAGE_MANIFEST, { cache: 'no-cache' }).then(response => (response.ok ? response.json() : null)),
+    cache.match(IMAGE_MANIFEST).then(response => (response ? response.json() : null))
+  ])
+    .then(([manifest, cached]) => {
+      if (!manifest || (cached && cached.version === manifest.version)) return;
+      // One missing file must not keep the others out of the cache
+      return Promise.all(manifest.urls.map(url => cache.add(url).catch(() => null)))
+        .then(() => cache.put(IMAGE_MANIFEST, new Response(JSON.stringify(manifest))));
+    })
+    .catch(error => console.log('Image precache skipped:', error));
+}
+
 // Fetch event - serve from cache when offline
 self.addEventListener('fetch', event => {
+  if (event.request.mode === 'navigate') {
+    event.waitUntil(caches.open(CACHE_NAME).then(precacheImages));
+  }
   event.respondWith(
     caches.match(event.request)
       .then(response => {
@@ -0,0 +1,70 @@
+import random
+
+import pytest
+
+from bar_geo import BarGeoIndex, build_geo_index, geohash_encode, haversine_km
+
+
+@pytest.mark.parametrize("lat, lon, precision, expected", [
+    (42.6, -5.6, 5, "ezs42"),
+    (57.64911, 10.40744, 11, "u4pruydqqvj"),
+    (-90.0, -180.0, 4, "0000"),
+    (89.9999, 179.9999, 4, "zzzz"),
+])
+def test_geohash_known_values(lat, lon, precision, expected):
+    assert geohash_encode(lat, lon, precision) == expected
+
+
+def random_bars(seed, count=3000):
+    """Bars spread over the globe, with clusters at both poles and the antimeridian"""
+    rng = random.Random(seed)
+    bars = []
+    for i in range(count):
+        region = i % 4
+        if region == 0:
+            lat, lon = rng.uniform(-90, 90), rng.uniform(-180, 180)
+        elif region == 1:
+            lat, lon = rng.uniform(85, 90), rng.uniform(-180, 180)
+        elif region == 2:
+            lat, lon = rng.uniform(-90, -85), rng.uniform(-180, 180)
+        else:
+            lat, lon = rng.uniform(-60, 60), rng.choice((-1, 1)) * rng.uniform(179, 180)
+        bars.append({"id": f"bar-{i}", "lat": lat, "lon": lon})
+    return bars
+
+
+@pytest.fixture(scope="module")
+def bars_and_index():
+    bars = random_bars(0)
+    return bars, BarGeoIndex(build_geo_index(bars), bars)
+
+
+QUERIES = [
+    (90.0, 0.0), (89.99, 45.0), (89.5, -120.0), (88.0, 179.9),
+    (-90.0, 0.0), (-89.9, 170.0), (-87.5, -179.5),
+    (0.0, 180.0), (0.0, -180.0), (10.0, 179.99), (-35.0, -179.99), (59.0, 179.5),
+    (27.96, -82.44),
+]
+
+
+@pytest.mark.parametrize("lat, lon", QUERIES)
+@pytest.mark.parametrize("radius_km", [0.5, 25, 150, 600, 2500])
+def test_within_matches_brute_force(bars_and_index, lat, lon, radius_km):
+    bars, index = bars_and_index
+
+    found = list(index.within(lat, lon, radius_km))
+    expected = {bar["id"] for bar in bars if haversine_km(lat, lon, bar["lat"], bar["lon"]) <= radius_km}
+    assert len(found) == len({bar_id for bar_id, _ in found}), "a bar was yielded twice"
+    assert {bar_id for bar_id, _ in found} == expected
+
+
+def test_nearby_sorts_by_distance_across_the_antimeridian():
+    bars = [
+        {"id": "east", "lat": 0.0, "lon": 179.99},
+        {"id": "west", "lat": 0.0, "lon": -179.95},
+        {"id": "far", "lat": 0.0, "lon": 178.0},
+    ]
+    index = BarGeoIndex(build_geo_index(bars), bars)
+    results = index.nearby(0.0, -179.999, 50)
+    assert [result["id"] for result in results] == ["east", "west"]
+    assert results[0]["distance_km"] == round(haversine_km(0.0, -179.999, 0.0, 179.99), 3)
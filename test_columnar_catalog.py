@@ -0,0 +1,126 @@
+import json
+import math
+import os
+import struct
+
+import numpy as np
+import pytest
+
+import parse_full_dataset
+import parse_latest_batch
+import parse_new_batch
+import parse_new_cocktails
+from batch_parser import read_batch
+from columnar_catalog import (ENUM_COLUMNS, MAGIC, MAX_MOOD, TABLE_COLUMNS, TEXT_COLUMNS, ColumnarCatalog,
+                              write_columnar)
+from feature_columns import FeatureColumns
+from recommend import MOODS
+
+BATCHES = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "batches")
+
+
+def shipped_catalog():
+    """Every shipped batch, classified by the ingest that owns it"""
+    builders = [
+        ("latest_batch", parse_latest_batch.parse_cocktail_row),
+        ("new_batch", parse_new_batch.build_drink),
+        ("new_cocktails", parse_new_cocktails.build_cocktail),
+        ("full_dataset", parse_full_dataset.build_cocktail),
+    ]
+    drinks = []
+    for name, build in builders:
+        for _, parts in read_batch(os.path.join(BATCHES, f"{name}.tsv"), name):
+            drink = build(parts)
+            if drink:
+                drinks.append(drink)
+    return drinks
+
+
+def expected_fields(drink):
+    """The part of a catalog drink the columnar format stores, as drink() returns it"""
+    expected = {"id": int(drink["id"])}
+    for column in TEXT_COLUMNS:
+        value = drink.get(column)
+        if isinstance(value, list):
+            value = ", ".join(value)
+        if value:
+            expected[column] = value
+    for column in ENUM_COLUMNS + TABLE_COLUMNS:
+        if drink.get(column):
+            expected[column] = drink[column]
+    expected["ingredients"] = list(drink.get("ingredients") or [])
+    moods = {mood: value for mood, value in (drink.get("moods") or {}).items()
+             if mood in MOODS and value is not None}
+    if moods:
+        expected["moods"] = moods
+    return expected
+
+
+def test_shipped_batches_round_trip(tmp_path):
+    drinks = shipped_catalog()
+    path = tmp_path / "drinks.bin"
+    write_columnar(drinks, path)
+    with ColumnarCatalog(path) as catalog:
+        assert len(catalog) == len(drinks)
+        for row, drink in enumerate(drinks):
+            assert catalog.drink(row) == expected_fields(drink)
+        features = FeatureColumns.from_drinks(drinks)
+        assert catalog.percents.tolist() == features.percents.tolist()
+        assert catalog.flags.tolist() == features.flags.tolist()
+
+
+EDGE_DRINKS = [
+    {"id": 1, "name": "Zero", "spirit": "Gin", "glass": "Coupe", "ingredients": ["Gin", "Ice"],
+     "moods": {"energetic": 0, "relaxed": 0.05, "romantic": 7.5, "adventurous": 9.25, "celebratory": MAX_MOOD,
+               "cozy": 10}},
+    {"id": 2, "name": "Partial", "ingredients": ["Gin"], "moods": {"cozy": 3, "dark": 8.0},
+     "garnish": ["lime", "mint"]},
+    {"id": 3, "name": "Café Ünïcode ✓", "description": None, "image": None, "ingredients": [], "moods": {}},
+    {"id": 4, "name": "Bare"},
+]
+
+
+def test_edge_cases_round_trip(tmp_path):
+    path = tmp_path / "drinks.bin"
+    write_columnar(EDGE_DRINKS, path)
+    with ColumnarCatalog(path) as catalog:
+        for row, drink in enumerate(EDGE_DRINKS):
+            assert catalog.drink(row) == expected_fields(drink)
+        assert catalog.drink(0)["moods"]["energetic"] == 0
+        assert "energetic" not in catalog.drink(1)["moods"]
+        assert "moods" not in catalog.drink(3)
+
+        values = catalog.mood_values()
+        assert values[0].tolist() == pytest.approx([0, 0.05, 7.5, 9.25, MAX_MOOD, 10])
+        assert [math.isnan(value) for value in values[1]] == [mood != "cozy" for mood in MOODS]
+        assert np.isnan(values[3]).all()
+
+        assert catalog.enum_mask("spirit", "Gin").tolist() == [True, False, False, False]
+        assert not catalog.enum_mask("spirit", "Rum").any()
+
+
+@pytest.mark.parametrize("value", [MAX_MOOD + 0.05, 13, -0.5])
+def test_moods_outside_the_stored_range_are_rejected(tmp_path, value):
+    drinks = [{"id": 7, "name": "Loud", "moods": {"cozy": value}}]
+    with pytest.raises(ValueError, match="Drink 7 \\(Loud\\): cozy mood"):
+        write_columnar(drinks, tmp_path / "drinks.bin")
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_rejects_other_files_and_versions(tmp_path):
+    path = tmp_path / "drinks.bin"
+    path.write_bytes(b"[]")
+    with pytest.raises(ValueError, match="not a columnar catalog"):
+        ColumnarCatalog(path)
+
+    write_columnar(EDGE_DRINKS, path)
+    data = path.read_bytes()
+    (length,) = struct.unpack_from("<I", data, len(MAGIC))
+    start = len(MAGIC) + 4
+    header = json.loads(data[start:start + length])
+    old = json.dumps(dict(header, version=1), separators=(",", ":")).encode("utf-8")
+    # Same length, so the block offsets still line up
+    old = old.ljust(length)
+    path.write_bytes(data[:start] + old + data[start + length:])
+    with pytest.raises(ValueError, match="format version 1"):
+        ColumnarCatalog(path)
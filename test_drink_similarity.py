@@ -0,0 +1,138 @@
+import random
+
+import numpy as np
+import pytest
+
+from drink_similarity import (INGREDIENT_WEIGHT, MOOD_WEIGHT, DrinkSimilarity, build_neighbors,
+                              build_similarity_artifact)
+from ingredients import drink_ingredients
+from recommend import MOODS, MoodMatrix, rerank_diverse, score_all, top_k
+
+
+def random_drinks(seed, count=120, without_moods=9):
+    """Every ``without_moods``-th drink has no moods (None: all have moods)"""
+    rng = random.Random(seed)
+    vocabulary = [f"ingredient {i}" for i in range(15)]
+    drinks = []
+    for i in range(count):
+        drink = {"id": 1000 + i, "shopping_list": rng.sample(vocabulary, rng.randint(1, 5))}
+        if without_moods is None or i % without_moods:
+            drink["moods"] = {mood: rng.uniform(1, 10) for mood in MOODS}
+        drinks.append(drink)
+    return drinks
+
+
+def similarity_matrix(drinks, min_jaccard):
+    """Every pair's similarity, straight from the definition"""
+    ingredients = [set(drink_ingredients(drink)) for drink in drinks]
+    result = [[0.0] * len(drinks) for _ in drinks]
+    for row, a in enumerate(drinks):
+        for col, b in enumerate(drinks):
+            jaccard = len(ingredients[row] & ingredients[col]) / len(ingredients[row] | ingredients[col])
+            if row == col or jaccard < min_jaccard:
+                continue
+            mood = 0.0
+            if a.get("moods") and b.get("moods"):
+                mood = 1 - sum(abs(a["moods"][m] - b["moods"][m]) for m in MOODS) / (len(MOODS) * 9)
+            result[row][col] = MOOD_WEIGHT * mood + INGREDIENT_WEIGHT * jaccard
+    return result
+
+
+def brute_force_neighbors(similarity, neighbors):
+    """Each drink's strongest pairs, then strongest first while both have room"""
+    keep = min(neighbors, len(similarity) - 1)
+    candidates = {}
+    for row, values in enumerate(similarity):
+        scored = [(value, col) for col, value in enumerate(values) if col != row]
+        for value, col in sorted(scored, reverse=True)[:keep]:
+            if value > 0:
+                candidates[min(row, col), max(row, col)] = round(value, 3)
+    result = [{} for _ in similarity]
+    for (row, col), value in sorted(candidates.items(), key=lambda item: (-item[1], item[0])):
+        if len(result[row]) < keep and len(result[col]) < keep:
+            result[row][col] = result[col][row] = value
+    return result
+
+
+@pytest.mark.parametrize("seed", [0, 1, 2])
+@pytest.mark.parametrize("neighbors, min_jaccard", [(3, 0.2), (10, 0.0), (200, 0.5)])
+def test_neighbors_match_brute_force(seed, neighbors, min_jaccard):
+    # Random mood floats make every positive similarity distinct, so the
+    # per-drink cut-off is unambiguous
+    drinks = random_drinks(seed, without_moods=None)
+    expected = brute_force_neighbors(similarity_matrix(drinks, min_jaccard), neighbors)
+    assert build_neighbors(drinks, neighbors, min_jaccard) == expected
+
+
+@pytest.mark.parametrize("seed", [0, 1, 2])
+@pytest.mark.parametrize("neighbors, min_jaccard", [(3, 0.2), (10, 0.0), (200, 0.5)])
+def test_neighbors_are_symmetric_capped_and_strongest(seed, neighbors, min_jaccard):
+    # Drinks without moods tie on ingredient overlap alone, and any of the
+    # tied partners may be kept; check the invariants instead
+    drinks = random_drinks(seed)
+    result = build_neighbors(drinks, neighbors, min_jaccard)
+    keep = min(neighbors, len(drinks) - 1)
+    similarity = similarity_matrix(drinks, min_jaccard)
+    # The keep-th strongest similarity of each drink
+    cutoff = [sorted(row, reverse=True)[keep - 1] for row in similarity]
+
+    for row, pairs in enumerate(result):
+        assert len(pairs) <= keep
+        for col, value in pairs.items():
+            assert result[col][row] == value
+            assert value == round(similarity[row][col], 3) > 0
+            assert similarity[row][col] >= min(cutoff[row], cutoff[col]) - 1e-12
+    # A pair that is some drink's clear top pick is only dropped when a drink is full
+    for row in range(len(drinks)):
+        for col in range(len(drinks)):
+            if similarity[row][col] > 0 and similarity[row][col] > cutoff[row] + 1e-12 and col not in result[row]:
+                assert len(result[row]) == keep or len(result[col]) == keep
+
+
+def test_lookup_follows_ids_into_another_catalog_order():
+    drinks = random_drinks(3, count=40)
+    artifact = build_similarity_artifact(drinks, neighbors=5)
+    shuffled = drinks[::-1] + [{"id": 1, "shopping_list": ["gin"]}]
+    original = DrinkSimilarity(artifact)
+    remapped = DrinkSimilarity(artifact, shuffled)
+    position = {drink["id"]: row for row, drink in enumerate(shuffled)}
+    for a in range(len(drinks)):
+        for b in range(len(drinks)):
+            assert remapped.get(position[drinks[a]["id"]], position[drinks[b]["id"]]) == original.get(a, b)
+    assert remapped.neighbors[-1] == {}
+
+
+def brute_force_mmr(scores, similarity, k, pool, diversity):
+    candidates = list(top_k(scores, pool))
+    if not candidates:
+        return []
+    best_score = scores[candidates[0]]
+    picks = []
+    while candidates and len(picks) < k:
+        def marginal(i):
+            redundancy = max((similarity.get(p, i) for p in picks), default=0.0)
+            return (1 - diversity) * scores[i] / best_score - diversity * redundancy
+        choice = max(candidates, key=marginal)  # first maximum: the higher-scored candidate
+        picks.append(choice)
+        candidates.remove(choice)
+    return picks
+
+
+@pytest.mark.parametrize("seed", range(10))
+@pytest.mark.parametrize("diversity", [0.0, 0.3, 1.0])
+def test_rerank_matches_brute_force_mmr(seed, diversity):
+    drinks = random_drinks(seed, count=80)
+    similarity = DrinkSimilarity(build_similarity_artifact(drinks, neighbors=8, min_jaccard=0.1))
+    rng = random.Random(seed)
+    user = {mood: rng.randint(1, 10) for mood in MOODS}
+    scores = score_all(MoodMatrix.from_drinks(drinks), user)
+
+    picks = rerank_diverse(scores, similarity, k=6, pool=20, diversity=diversity)
+    assert picks.tolist() == brute_force_mmr(scores, similarity, 6, 20, diversity)
+    if diversity == 0.0:
+        assert picks.tolist() == top_k(scores, 6).tolist()
+
+
+def test_rerank_without_candidates():
+    scores = np.array([np.nan, 0.0, -1.0])
+    assert len(rerank_diverse(scores, DrinkSimilarity({"ids": [1, 2, 3], "neighbors": [[], [], []]}))) == 0
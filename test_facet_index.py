@@ -0,0 +1,105 @@
+import random
+
+import pytest
+
+from facet_index import FACETS, FacetIndex, build_facet_index, catalog_fingerprint, facet_key, intersect_sorted
+
+VALUES = {
+    "spirit": ["Gin", "gin", "Rum", "Vodka", "Tequila", None],
+    "difficulty": ["Easy", "Medium", "Hard"],
+    "glass": ["Cocktail glass", "Cocktail Glass", "Highball  glass", "Old-fashioned glass", ""],
+    "category": ["Cocktail", "Shot", "Punch / Party Drink", None],
+}
+
+
+def random_drinks(seed, count=400):
+    rng = random.Random(seed)
+    ids = rng.sample(range(1, 100000), count)
+    drinks = []
+    for drink_id in ids:
+        drink = {"id": drink_id}
+        for facet in FACETS:
+            value = rng.choice(VALUES[facet])
+            if value is not None:
+                drink[facet] = value
+        drinks.append(drink)
+    return drinks
+
+
+def brute_force(drinks, filters):
+    """Ids, sorted, of drinks matching any selected value of every filtered facet"""
+    return sorted(drink["id"] for drink in drinks
+                  if all(facet_key(drink.get(facet)) in {facet_key(value) for value in values}
+                         for facet, values in filters.items()))
+
+
+def random_filters(rng):
+    filters = {}
+    for facet in rng.sample(FACETS, rng.randint(1, 3)):
+        choices = [value for value in VALUES[facet] if value] + ["Absinthe"]
+        filters[facet] = rng.sample(choices, rng.randint(1, 2))
+    return filters
+
+
+@pytest.mark.parametrize("seed", range(30))
+def test_select_and_counts_match_brute_force(seed):
+    rng = random.Random(seed)
+    drinks = random_drinks(seed)
+    index = FacetIndex(build_facet_index(drinks))
+    filters = random_filters(rng)
+
+    assert index.select(filters) == brute_force(drinks, filters)
+    counts = index.facet_counts(filters)
+    for facet in FACETS:
+        others = {name: values for name, values in filters.items() if name != facet}
+        for value in counts[facet]:
+            assert counts[facet][value] == len(brute_force(drinks, dict(others, **{facet: [value]})))
+
+
+def test_values_merge_case_and_whitespace_under_the_most_common_spelling():
+    drinks = [{"id": 1, "glass": "Cocktail glass"}, {"id": 2, "glass": "cocktail  Glass"},
+              {"id": 3, "glass": "Cocktail glass"}, {"id": 4, "glass": " "}, {"id": 5}]
+    artifact = build_facet_index(drinks)
+    assert artifact["facets"]["glass"] == {"Cocktail glass": [1, 2, 3]}
+    assert artifact["counts"]["glass"] == {"Cocktail glass": 3}
+    index = FacetIndex(artifact)
+    assert index.select({"glass": "COCKTAIL GLASS"}) == [1, 2, 3]
+    assert index.select({"glass": "all", "spirit": []}) is None
+
+
+def test_duplicate_ids_are_rejected():
+    drinks = random_drinks(0, count=20)
+    with pytest.raises(ValueError, match=str(drinks[4]["id"])):
+        build_facet_index(drinks + [dict(drinks[4])])
+
+
+def test_unknown_facet_is_rejected():
+    with pytest.raises(ValueError):
+        FacetIndex(build_facet_index(random_drinks(0, count=5))).select({"colour": "Blue"})
+
+
+@pytest.mark.parametrize("ids, expected", [
+    # FNV-1a 32-bit test vectors: "", "a", "foobar"
+    ([], 0x811C9DC5),
+    (["a"], 0xE40C292C),
+    (["foobar"], 0xBF9CF968),
+])
+def test_fingerprint_known_values(ids, expected):
+    assert catalog_fingerprint([{"id": drink_id} for drink_id in ids]) == expected
+
+
+def test_fingerprint_tells_same_size_catalogs_apart():
+    drinks = random_drinks(1, count=50)
+    fingerprint = build_facet_index(drinks)["fingerprint"]
+    assert fingerprint == catalog_fingerprint(drinks)
+    assert catalog_fingerprint(drinks[::-1]) != fingerprint
+    assert catalog_fingerprint(drinks[:-1] + [{"id": drinks[-1]["id"] + 1}]) != fingerprint
+
+
+@pytest.mark.parametrize("seed", range(20))
+def test_intersect_sorted_matches_sets(seed):
+    rng = random.Random(seed)
+    a = sorted(rng.sample(range(500), rng.randint(0, 60)))
+    b = sorted(rng.sample(range(500), rng.randint(0, 300)))
+    assert intersect_sorted(a, b) == sorted(set(a) & set(b))
+    assert intersect_sorted(b, a) == sorted(set(a) & set(b))
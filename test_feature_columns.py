@@ -0,0 +1,96 @@
+import os
+import random
+
+import pytest
+
+from batch_parser import read_batch
+from feature_columns import (FLAG_COLUMNS, FLAG_START, PERCENT_COLUMNS, PERCENT_START, FeatureColumns,
+                             parse_features)
+
+DATA = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data")
+
+
+def row(percents=(), flags=()):
+    parts = ["1", "Name"] + [""] * (PERCENT_START - 2) + list(percents)
+    parts += [""] * (FLAG_START - len(parts))
+    return parts + list(flags)
+
+
+def test_shipped_batch_row():
+    rows = {parts[0]: parts for _, parts in read_batch(os.path.join(DATA, "batches", "latest_batch.tsv"),
+                                                       "latest_batch")}
+    assert parse_features(rows["5016"]) == {"percents": [36, 8, 24, 24, 8, 35, 46], "flags": 0}
+
+
+@pytest.mark.parametrize("parts, expected", [
+    (row(["12%", "33.5%", " 7 ", "", "n/a", "150%", "-3"], ["x", "", " X ", "", "", "x"]),
+     {"percents": [12, 34, 7, None, None, 100, 0], "flags": 0b100101}),
+    # Short rows: every column past the end is missing
+    (row(["50%", "25%"]), {"percents": [50, 25, None, None, None, None, None], "flags": 0}),
+    (row(["1%"] * 7, ["x", "y", "xx", "x"]), {"percents": [1] * 7, "flags": 0b1001}),
+])
+def test_parse_features(parts, expected):
+    assert parse_features(parts) == expected
+
+
+def random_drinks(seed, count=500):
+    rng = random.Random(seed)
+    drinks = []
+    for i in range(count):
+        if i % 10 == 0:
+            drinks.append({"id": i})  # ingested before features were parsed
+            continue
+        percents = [None if rng.random() < 0.1 else rng.randint(0, 100) for _ in PERCENT_COLUMNS]
+        drinks.append({"id": i, "features": {"percents": percents, "flags": rng.randrange(1 << len(FLAG_COLUMNS))}})
+    return drinks
+
+
+def brute_force(drinks, all_flags=(), any_flags=(), no_flags=(), min_percent=None, max_percent=None):
+    ids = []
+    for drink in drinks:
+        features = drink.get("features") or {"percents": [None] * len(PERCENT_COLUMNS), "flags": 0}
+        flags = {name for bit, name in enumerate(FLAG_COLUMNS) if features["flags"] >> bit & 1}
+        percents = dict(zip(PERCENT_COLUMNS, features["percents"]))
+        if not set(all_flags) <= flags or (any_flags and not flags & set(any_flags)) or flags & set(no_flags):
+            continue
+        if any(percents[name] is None or percents[name] < bound for name, bound in (min_percent or {}).items()):
+            continue
+        # A missing percentage is stored as 255, above any upper bound
+        if any(percents[name] is None or percents[name] > bound for name, bound in (max_percent or {}).items()):
+            continue
+        ids.append(drink["id"])
+    return ids
+
+
+@pytest.mark.parametrize("seed", range(40))
+def test_select_matches_brute_force(seed):
+    rng = random.Random(seed)
+    drinks = random_drinks(seed)
+    columns = FeatureColumns.from_drinks(drinks)
+    conditions = {
+        "all_flags": rng.sample(FLAG_COLUMNS, rng.randint(0, 2)),
+        "any_flags": rng.sample(FLAG_COLUMNS, rng.randint(0, 3)),
+        "no_flags": rng.sample(FLAG_COLUMNS, rng.randint(0, 2)),
+        "min_percent": {name: rng.randint(0, 60) for name in rng.sample(PERCENT_COLUMNS, rng.randint(0, 2))},
+        "max_percent": {name: rng.randint(40, 100) for name in rng.sample(PERCENT_COLUMNS, rng.randint(0, 2))},
+    }
+    assert columns.filter_ids(**conditions).tolist() == brute_force(drinks, **conditions)
+
+
+def test_save_and_load(tmp_path):
+    drinks = random_drinks(1)
+    columns = FeatureColumns.from_drinks(drinks)
+    path = tmp_path / "features.npz"
+    columns.save(path)
+    loaded = FeatureColumns.load(path)
+    assert loaded.ids.tolist() == columns.ids.tolist()
+    assert loaded.percents.tolist() == columns.percents.tolist()
+    assert loaded.flags.tolist() == columns.flags.tolist()
+
+
+def test_unknown_columns_are_rejected():
+    columns = FeatureColumns.from_drinks(random_drinks(2, count=10))
+    with pytest.raises(ValueError):
+        columns.select(all_flags=["flag_9"])
+    with pytest.raises(ValueError):
+        columns.select(min_percent={"sweet_pct": 10})
@@ -0,0 +1,71 @@
+import math
+import random
+from itertools import combinations
+
+import pytest
+
+from ingredient_pairs import build_pairs_artifact
+from ingredients import drink_ingredients
+
+SMALL = [
+    {"shopping_list": ["Gin", "Tonic water"]},
+    {"shopping_list": ["Gin", "Tonic water", "Lime"]},
+    {"shopping_list": ["Rum", "Lime"]},
+    {"shopping_list": ["Gin", "Lime"]},
+]
+
+
+def partners(artifact, name):
+    names = artifact["ingredients"]
+    return {names[j]: (score, together) for j, score, together in artifact["pairs"][names.index(name)]}
+
+
+def test_known_scores():
+    artifact = build_pairs_artifact(SMALL, min_count=1)
+    assert dict(zip(artifact["ingredients"], artifact["counts"])) == {"gin": 3, "tonic water": 2, "lime": 3, "rum": 1}
+    assert partners(artifact, "gin") == {
+        "tonic water": (round(math.log(2 * 4 / (3 * 2)), 3), 2),
+        "lime": (round(math.log(2 * 4 / (3 * 3)), 3), 2),
+    }
+    assert partners(artifact, "rum") == {"lime": (round(math.log(1 * 4 / (1 * 3)), 3), 1)}
+    # A pair from a single drink is dropped by the default min_count
+    assert partners(build_pairs_artifact(SMALL), "rum") == {}
+
+
+def random_catalog(seed, drinks=300, vocabulary=40):
+    rng = random.Random(seed)
+    names = [f"ingredient {i}" for i in range(vocabulary)]
+    # Skewed popularity so some pairs are common and some are rare
+    weights = [1 / (i + 1) for i in range(vocabulary)]
+    return [{"shopping_list": list({*rng.choices(names, weights, k=rng.randint(1, 6))})} for _ in range(drinks)]
+
+
+@pytest.mark.parametrize("seed", [0, 1, 2])
+@pytest.mark.parametrize("top_n, min_count", [(3, 2), (10, 1), (100, 5)])
+def test_matches_brute_force(seed, top_n, min_count):
+    drinks = random_catalog(seed)
+    artifact = build_pairs_artifact(drinks, top_n=top_n, min_count=min_count)
+
+    counts = {}
+    together = {}
+    for drink in drinks:
+        names = drink_ingredients(drink)
+        for name in names:
+            counts[name] = counts.get(name, 0) + 1
+        for a, b in combinations(names, 2):
+            together[a, b] = together.get((a, b), 0) + 1
+            together[b, a] = together.get((b, a), 0) + 1
+
+    assert dict(zip(artifact["ingredients"], artifact["counts"])) == counts
+    names = artifact["ingredients"]
+    for i, name in enumerate(names):
+        expected = sorted(
+            ((math.log(n * len(drinks) / (counts[a] * counts[b])), n)
+             for (a, b), n in together.items() if a == name and n >= min_count),
+            reverse=True)[:top_n]
+        got = artifact["pairs"][i]
+        # Ties at the cut-off may keep either partner, so compare the scores
+        assert [(score, n) for _, score, n in got] == [(round(score, 3), n) for score, n in expected]
+        for j, score, n in got:
+            assert together[name, names[j]] == n
+            assert score == round(math.log(n * len(drinks) / (counts[name] * counts[names[j]])), 3)
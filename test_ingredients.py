@@ -0,0 +1,42 @@
+import pytest
+
+from ingredients import canonical_ingredient, drink_ingredients
+
+
+@pytest.mark.parametrize("line, name", [
+    ("1 1/2 oz gin", "gin"),
+    ("1 1/2 oz Bacardi(R) silver rum", "bacardi silver rum"),
+    ("1/2 lemon", "lemon"),
+    ("1.5-2 oz vodka", "vodka"),
+    ("2-3 dashes Angostura bitters", "angostura bitters"),
+    ("Juice of 1/2 lime", "lime"),
+    ("1 ozfresh lime juice", "fresh lime juice"),
+    ("3 ozcold cola", "cold cola"),
+    ("1/2 tblsp Grenadine", "grenadine"),
+    ("a dash of bitters", "bitters"),
+    ("Top with soda water", "soda water"),
+    ("2 cl Cointreau (orange liqueur)", "cointreau"),
+    # Numbers that are part of a product name stay
+    ("7-Up", "7-up"),
+    ("99 Bananas", "99 bananas"),
+    ("151 proof rum", "151 proof rum"),
+    ("1 oz 99 Bananas", "99 bananas"),
+    ("ozone", "ozone"),
+])
+def test_canonical_ingredient(line, name):
+    assert canonical_ingredient(line) == name
+
+
+def test_plain_names_are_not_measured():
+    assert canonical_ingredient("1 1/2 oz gin", measured=False) == "1 1 2 oz gin"
+    assert canonical_ingredient("Cointreau(R) orange liqueur", measured=False) == "cointreau orange liqueur"
+
+
+def test_drink_ingredients_prefers_shopping_list():
+    drink = {"ingredients": ["12 oz 7-Up or Sprite", "1 oz gin"], "shopping_list": ["7-Up", "Gin", "gin"]}
+    assert drink_ingredients(drink) == ["7-up", "gin"]
+
+
+def test_drink_ingredients_from_measured_lines():
+    drink = {"ingredients": "1 1/2 oz gin|1/2 oz fresh lime juice|1 1/2 oz gin"}
+    assert drink_ingredients(drink) == ["gin", "fresh lime juice"]
@@ -0,0 +1,85 @@
+import json
+import os
+
+import numpy as np
+import pytest
+
+from batch_parser import read_batch
+from mood_mapping import DEFAULT_MAPPING, MOODS, SOURCE_COLUMNS, MoodMapping, remap_catalog
+from parse_latest_batch import parse_cocktail_row
+
+DATA = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data")
+
+
+def drink(**scores):
+    return {"id": 1, "name": "Test", "source_scores": scores, "moods": {}}
+
+
+def test_default_mapping_matches_latest_batch_ingest():
+    drinks = [parse_cocktail_row(parts) for _, parts in read_batch(os.path.join(DATA, "batches", "latest_batch.tsv"), "latest_batch")]
+    drinks = [d for d in drinks if d]
+    expected = [dict(d["moods"]) for d in drinks]
+    for d in drinks:
+        d["moods"] = {}
+
+    assert remap_catalog(drinks, MoodMapping.from_config(DEFAULT_MAPPING)) == len(drinks)
+    for d, moods in zip(drinks, expected):
+        assert d["moods"] == pytest.approx(moods)
+
+
+def test_shipped_config_is_the_default():
+    with open(os.path.join(DATA, "mood_mapping.json"), "r", encoding="utf-8") as f:
+        assert json.load(f) == DEFAULT_MAPPING
+
+
+def test_weights_bias_and_clamp():
+    config = {
+        "weights": {"energetic": {"thirsty": 2.0}, "cozy": {"dark": 1.0, "calm": -1.0}},
+        "bias": {"relaxed": 3.0, "cozy": 1.0},
+        "clamp": [0, 10],
+    }
+    drinks = [drink(dark=4, thirsty=7, calm=1, celebrate=5, fancy=5)]
+    remap_catalog(drinks, MoodMapping.from_config(config))
+    assert drinks[0]["moods"] == {"energetic": 10.0, "relaxed": 3.0, "romantic": 0.0,
+                                  "adventurous": 0.0, "celebratory": 0.0, "cozy": 4.0}
+
+
+@pytest.mark.parametrize("value, expected", [(6.5, 7), (7.5, 8), (6.49, 6), (0.5, 1), (10.5, 10)])
+def test_rounding_is_half_up_after_clamp(value, expected):
+    config = dict(DEFAULT_MAPPING, round=True)
+    drinks = [drink(dark=value, thirsty=5, calm=5, celebrate=5, fancy=5)]
+    remap_catalog(drinks, MoodMapping.from_config(config))
+    assert drinks[0]["moods"]["cozy"] == expected
+    assert all(type(value) is int for value in drinks[0]["moods"].values())
+
+
+def test_apply_matches_per_drink_arithmetic():
+    rng = np.random.default_rng(0)
+    sources = rng.uniform(-2, 12, size=(50, len(SOURCE_COLUMNS)))
+    mapping = MoodMapping.from_config(DEFAULT_MAPPING)
+    moods = mapping.apply(sources)
+    for row, result in zip(sources, moods):
+        scores = dict(zip(SOURCE_COLUMNS, row))
+        for i, mood in enumerate(MOODS):
+            weights = DEFAULT_MAPPING["weights"][mood]
+            value = sum(weight * scores[column] for column, weight in weights.items())
+            assert result[i] == pytest.approx(min(10, max(1, value)))
+
+
+def test_missing_columns_and_drinks_without_scores():
+    drinks = [drink(dark=9), {"id": 2, "name": "Old", "moods": {"cozy": 3}}]
+    assert remap_catalog(drinks, MoodMapping.from_config(DEFAULT_MAPPING)) == 1
+    assert drinks[0]["moods"]["cozy"] == 9.0
+    assert drinks[0]["moods"]["romantic"] == 7.0
+    assert drinks[0]["moods"]["energetic"] == 5.0
+    assert drinks[1]["moods"] == {"cozy": 3}
+
+
+@pytest.mark.parametrize("config", [
+    {"weights": {"sleepy": {"dark": 1.0}}},
+    {"weights": {"cozy": {"sweet": 1.0}}},
+    {"bias": {"sleepy": 1.0}},
+])
+def test_unknown_names_are_rejected(config):
+    with pytest.raises(ValueError):
+        MoodMapping.from_config(config)
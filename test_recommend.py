@@ -0,0 +1,76 @@
+import os
+import random
+
+import numpy as np
+import pytest
+
+import recommend
+from batch_parser import read_batch
+from parse_latest_batch import parse_cocktail_row
+from recommend import MOODS, MoodMatrix, check_parity, score_all, score_drink, top_k
+
+DATA = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data")
+
+
+def catalog():
+    """The shipped latest batch plus the mood shapes the other ingests produce"""
+    drinks = [parse_cocktail_row(parts) for _, parts in read_batch(os.path.join(DATA, "batches", "latest_batch.tsv"),
+                                                                   "latest_batch")]
+    drinks = [drink for drink in drinks if drink]
+    drinks += [
+        # parse_new_batch.py keys: only some sliders, plus source columns
+        {"id": 1, "moods": {"dark": 7.0, "thirsty": 3.0, "calm": 6.0, "celebrate": 8.0, "energetic": 4.0, "fancy": 5.0}},
+        # A zero counts as missing for the sliders (|| in script.js) but still adds to intensity
+        {"id": 2, "moods": {"energetic": 0, "relaxed": 10, "romantic": 1, "adventurous": 9, "celebratory": 0, "cozy": 4}},
+        {"id": 3, "moods": {}},
+        {"id": 4},
+        {"id": 5, "moods": {mood: 5 for mood in MOODS}},
+    ]
+    return drinks
+
+
+@pytest.mark.parametrize("user, drink, expected", [
+    ({mood: 5 for mood in MOODS}, {mood: 5 for mood in MOODS}, 2.0),
+    # 0.4 * 6 * 0.8 + 0.3 * 8 + 0.2 * (10 - |5.5 - 31 / 6|) + 0.1 * 10 / 6
+    (dict({mood: 5 for mood in MOODS}, energetic=8), dict({mood: 5 for mood in MOODS}, energetic=6), 6.42),
+    # Avoided moods are compared against 10 - value; a missing mood counts as 5
+    (dict({mood: 5 for mood in MOODS}, cozy=2), {"cozy": 8, "relaxed": 5}, 0.3 * 10 + 0.2 * (10 - abs(27 / 6 - 13 / 6))),
+])
+def test_score_drink_known_values(user, drink, expected):
+    assert score_drink(drink, user) == pytest.approx(expected)
+
+
+def test_parity_on_every_catalog_shape():
+    assert check_parity(catalog(), samples=300) <= 1e-9
+
+
+def test_drinks_without_moods_are_never_scored():
+    drinks = catalog()
+    scores = score_all(MoodMatrix.from_drinks(drinks), {mood: 9 for mood in MOODS})
+    assert np.isnan(scores[-3]) and np.isnan(scores[-2])
+    assert not np.isnan(scores[-1])
+    assert all(index not in (len(drinks) - 3, len(drinks) - 2) for index in top_k(scores, len(drinks)))
+
+
+def test_parity_reports_a_disagreement(monkeypatch):
+    original = recommend.score_all
+
+    def off_by_a_little(matrix, user_moods):
+        scores = original(matrix, user_moods)
+        scores[3] += 1e-6
+        return scores
+
+    monkeypatch.setattr(recommend, "score_all", off_by_a_little)
+    with pytest.raises(AssertionError):
+        check_parity(catalog(), samples=5)
+    assert check_parity(catalog(), samples=5, tolerance=1e-5) == pytest.approx(1e-6)
+
+
+@pytest.mark.parametrize("k", [1, 6, 30])
+def test_top_k_matches_a_full_sort(k):
+    rng = random.Random(k)
+    # Few distinct values so ties are common
+    scores = np.array([rng.choice([0.0, -1.0, 2.5, 3.0, 3.0, 7.25, np.nan]) for _ in range(200)])
+    ranked = sorted((i for i in range(len(scores)) if scores[i] > 0), key=lambda i: (-scores[i], i))
+    assert top_k(scores, k).tolist() == ranked[:k]
+    assert top_k(scores, k, exclude=ranked[:1]).tolist() == ranked[1:k + 1]
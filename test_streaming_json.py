@@ -0,0 +1,32 @@
+import json
+
+import pytest
+
+from streaming_json import JsonArrayWriter, iter_json_array
+
+ITEMS = [0.5, -12, 1e5, 3.25e-2, True, False, None, "a, b]", [1, [2.5]], {"id": 7, "moods": {"cozy": 7.5}}, 10]
+
+
+@pytest.mark.parametrize("chunk_size", [1, 2, 3, 7, 64])
+@pytest.mark.parametrize("indent", [None, 2])
+def test_round_trip_small_chunks(tmp_path, chunk_size, indent):
+    path = tmp_path / "items.json"
+    with JsonArrayWriter(path, indent=indent) as writer:
+        writer.write_all(ITEMS)
+    assert json.loads(path.read_text(encoding="utf-8")) == ITEMS
+    assert list(iter_json_array(path, chunk_size=chunk_size)) == ITEMS
+
+
+@pytest.mark.parametrize("text", ["[]", " [ ] ", "[0.5]", "[1 , 2 ]"])
+def test_small_arrays(tmp_path, text):
+    path = tmp_path / "items.json"
+    path.write_text(text, encoding="utf-8")
+    assert list(iter_json_array(path, chunk_size=1)) == json.loads(text)
+
+
+@pytest.mark.parametrize("text", ["[1 2]", "[1,", "{}"])
+def test_malformed(tmp_path, text):
+    path = tmp_path / "items.json"
+    path.write_text(text, encoding="utf-8")
+    with pytest.raises(ValueError):
+        list(iter_json_array(path, chunk_size=1))
@@ -0,0 +1,259 @@
+#!/usr/bin/env python3
+"""
+Single entry point for the ThinkDrink data tooling.
+
+    ingest SOURCE [BATCH]   parse a batch export into the catalog
+    extract [EXCEL]         extract drinks from the Drink Think workbook
+    merge                   merge extracted drinks into the catalog
+    build-index [NAME ...]  build the derived artifacts in data/
+    bench                   run the load generator, or check startup time
+
+Only argparse, json and os are imported at startup; each subcommand imports
+the scripts it runs (and through them pandas, NumPy or SciPy) when it runs,
+so help, ingests and other quick commands start in tens of milliseconds.
+``bench --startup`` enforces that with ``python -X importtime``.
+
+Paths come from the command line, then from a JSON config file
+(THINKDRINK_CONFIG, default ./thinkdrink.json, optional), then from each
+script's default under data/:
+
+    {"catalog": "data/drinks.json", "excel": "~/Downloads/Drink Think v2.41.xlsx",
+     "extracted": "data/drink_think_data.json", "batches": {"latest_batch": "..."}}
+
+Usage:
+    python3 thinkdrink.py ingest latest_batch [data/batches/latest_batch.tsv] [--catalog PATH]
+    python3 thinkdrink.py extract [EXCEL] [--output PATH] [--raw]
+    python3 thinkdrink.py merge [--catalog PATH] [--new-data PATH] [--streaming]
+    python3 thinkdrink.py build-index [autocomplete facets ...] [-- extra args for one index]
+    python3 thinkdrink.py bench [loadgen args] | bench --startup [--budget-ms 50]
+"""
+
+import argparse
+import json
+import os
+import sys
+
+DEFAULT_CONFIG = "thinkdrink.json"
+
+# source -> (module, function(batch_path, catalog_path))
+INGEST_SOURCES = {
+    "full_dataset": ("parse_full_dataset", "parse_full_cocktail_dataset"),
+    "new_cocktails": ("parse_new_cocktails", "parse_cocktail_data"),
+    "latest_batch": ("parse_latest_batch", "main"),
+    "new_batch": ("parse_new_batch", "parse_cocktail_data"),
+}
+
+# index -> (module whose main(argv) builds it, whether it reads the catalog)
+INDEXES = {
+    "images": ("placeholder_images", True),
+    "autocomplete": ("autocomplete_index", True),
+    "facets": ("facet_index", True),
+    "features": ("feature_columns", True),
+    "pairs": ("ingredient_pairs", True),
+    "similarity": ("drink_similarity", True),
+    "geo": ("bar_geo", False),
+    "columns": ("columnar_catalog", True),
+}
+# Built when no index is named; images rewrites the catalog, so it is opt-in
+DEFAULT_INDEXES = ("autocomplete", "facets", "features", "pairs", "similarity", "geo", "columns")
+
+STARTUP_BUDGET_MS = 50
+HEAVY_MODULES = ("numpy", "pandas", "scipy")
+
+
+def load_config(path=None):
+    """Read the JSON config; a missing default config is an empty one"""
+    explicit = path or os.environ.get("THINKDRINK_CONFIG")
+    path = explicit or DEFAULT_CONFIG
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except FileNotFoundError:
+        if explicit:
+            raise
+        return {}
+
+
+def _import(module):
+    import importlib
+
+    return importlib.import_module(module)
+
+
+def cmd_ingest(args, config, extra):
+    module, function = INGEST_SOURCES[args.source]
+    kwargs = {}
+    batch = args.batch or config.get("batches", {}).get(args.source)
+    if batch:
+        kwargs["batch_path"] = batch
+    catalog = args.catalog or config.get("catalog")
+    if catalog:
+        kwargs["catalog_path"] = catalog
+    # Each ingest returns its IngestMetrics; rows it could not parse fail the command
+    metrics = getattr(_import(module), function)(**kwargs)
+    if metrics.total_errors:
+        print(f"{metrics.total_errors} errors during ingest", file=sys.stderr)
+        return 1
+
+
+def cmd_extract(args, config, extra):
+    excel = args.excel or config.get("excel")
+    if excel is None:
+        raise SystemExit("No workbook given: pass EXCEL or set \"excel\" in the config")
+    output = args.output or config.get("extracted") or "data/drink_think_data.json"
+    if args.raw:
+        result = _import("extract_excel_data").extract_excel_data(os.path.expanduser(excel), output)
+    else:
+        result = _import("extract_drink_data").extract_drink_data(os.path.expanduser(excel), output)
+    if result is None:
+        return 1
+
+
+def cmd_merge(args, config, extra):
+    merge = _import("merge_drink_data")
+    catalog = args.catalog or config.get("catalog")
+    new_data = args.new_data or config.get("extracted")
+    if args.streaming:
+        result = merge.merge_drink_data_streaming(catalog, new_data)
+    else:
+        result = merge.merge_drink_data(catalog, new_data)
+    # The merge functions print the error and return None
+    if result is None:
+        return 1
+
+
+def cmd_build_index(args, config, extra):
+    import time
+
+    names = args.names or DEFAULT_INDEXES
+    unknown = [name for name in names if name not in INDEXES]
+    if unknown:
+        raise SystemExit(f"Unknown index {', '.join(unknown)} (expected one of {', '.join(INDEXES)})")
+    if extra and len(names) != 1:
+        raise SystemExit("Extra arguments can only be passed when building a single index")
+    catalog = args.catalog or config.get("catalog")
+    for name in names:
+        module, reads_catalog = INDEXES[name]
+        argv = list(extra)
+        if reads_catalog and catalog:
+            argv = ["--catalog", catalog] + argv
+        print(f"== {name} ({module}.py)")
+        start = time.perf_counter()
+        _import(module).main(argv)
+        print(f"Built {name} in {time.perf_counter() - start:.2f}s\n")
+
+
+def import_times(command, repeat=3):
+    """Run ``python -X importtime *command``; return (total ms, imported module names)
+
+    The total is the cumulative time of every top-level import, which
+    includes the interpreter's own startup imports; like timeit, the best of
+    ``repeat`` runs is kept.
+    """
+    import subprocess
+
+    best_us = None
+    modules = set()
+    for _ in range(repeat):
+        completed = subprocess.run([sys.executable, "-X", "importtime", *command],
+                                   capture_output=True, text=True,
+                                   cwd=os.path.dirname(os.path.abspath(__file__)))
+        total_us = 0
+        for line in completed.stderr.splitlines():
+            if not line.startswith("import time:") or "cumulative" in line:
+                continue
+            _, cumulative, name = line[len("import time:"):].split("|")
+            if not name.startswith("  "):
+                total_us += int(cumulative)
+            modules.add(name.strip())
+        best_us = total_us if best_us is None else min(best_us, total_us)
+    return best_us / 1000, modules
+
+
+def startup_checks():
+    """Commands whose import time must stay within the startup budget"""
+    checks = [["thinkdrink.py", "--help"]]
+    checks += [["thinkdrink.py", name, "--help"] for name in ("ingest", "extract", "merge", "build-index", "bench")]
+    # What an ingest or merge run imports before it starts reading files
+    checks += [["-c", f"import {module}"] for module, _ in INGEST_SOURCES.values()]
+    checks += [["-c", "import merge_drink_data"], ["-c", "import extract_drink_data"]]
+    return checks
+
+
+def check_startup(budget_ms=STARTUP_BUDGET_MS):
+    """Print import time per quick command; return how many broke the budget"""
+    failures = 0
+    checks = startup_checks()
+    for command in checks:
+        total_ms, modules = import_times(command)
+        heavy = sorted(name for name in HEAVY_MODULES if name in modules)
+        ok = total_ms <= budget_ms and not heavy
+        failures += not ok
+        note = f" imports {', '.join(heavy)}" if heavy else ""
+        print(f"{'ok' if ok else 'FAIL':4} {total_ms:7.1f} ms  {' '.join(command)}{note}")
+    print(f"{failures} of {len(checks)} commands over the {budget_ms} ms budget")
+    return failures
+
+
+def cmd_bench(args, config, extra):
+    if args.startup:
+        return 1 if check_startup(args.budget_ms) else 0
+    catalog = args.catalog or config.get("catalog")
+    argv = (["--catalog", catalog] if catalog else []) + list(extra)
+    _import("loadgen").main(argv)
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog="thinkdrink", description="ThinkDrink data tooling")
+    parser.add_argument("--config", help=f"JSON config file (default: $THINKDRINK_CONFIG or {DEFAULT_CONFIG})")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    ingest = commands.add_parser("ingest", help="parse a batch export into the catalog")
+    ingest.add_argument("source", choices=sorted(INGEST_SOURCES))
+    ingest.add_argument("batch", nargs="?", help="batch file (default: data/batches/<source>.tsv)")
+    ingest.add_argument("--catalog")
+    ingest.set_defaults(handler=cmd_ingest)
+
+    extract = commands.add_parser("extract", help="extract drinks from the Excel workbook")
+    extract.add_argument("excel", nargs="?")
+    extract.add_argument("--output")
+    extract.add_argument("--raw", action="store_true", help="header-sniffing dump of the first sheet")
+    extract.set_defaults(handler=cmd_extract)
+
+    merge = commands.add_parser("merge", help="merge extracted drinks into the catalog")
+    merge.add_argument("--catalog")
+    merge.add_argument("--new-data")
+    merge.add_argument("--streaming", action="store_true", help="bounded-memory merge")
+    merge.set_defaults(handler=cmd_merge)
+
+    build_index = commands.add_parser("build-index", help="build derived artifacts in data/")
+    build_index.add_argument("names", nargs="*", metavar="NAME",
+                             help=f"{', '.join(INDEXES)} (default: {' '.join(DEFAULT_INDEXES)})")
+    build_index.add_argument("--catalog")
+    build_index.set_defaults(handler=cmd_build_index)
+
+    bench = commands.add_parser("bench", help="run loadgen.py (extra args are passed on) or check startup time")
+    bench.add_argument("--startup", action="store_true", help="check import time of quick commands")
+    bench.add_argument("--budget-ms", type=float, default=STARTUP_BUDGET_MS)
+    bench.add_argument("--catalog")
+    bench.set_defaults(handler=cmd_bench)
+    return parser
+
+
+def main(argv=None):
+    parser = build_parser()
+    argv = sys.argv[1:] if argv is None else list(argv)
+    # Everything after "--" is passed on untouched
+    passed_on = []
+    if "--" in argv:
+        split = argv.index("--")
+        argv, passed_on = argv[:split], argv[split + 1:]
+    args, extra = parser.parse_known_args(argv)
+    extra += passed_on
+    if extra and args.command not in ("build-index", "bench"):
+        parser.error(f"unrecognized arguments: {' '.join(extra)}")
+    return args.handler(args, load_config(args.config), extra)
+
+
+if __name__ == "__main__":
+    sys.exit(main())